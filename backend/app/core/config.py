@@ -1,6 +1,7 @@
 # backend/app/core/config.py
 
 from pydantic_settings import BaseSettings
+from typing import Optional
 
 class Settings(BaseSettings):
     twilio_account_sid: str
@@ -9,9 +10,76 @@ class Settings(BaseSettings):
     speech_key: str
     speech_region: str
     openai_api_key: str
+    # Structured (json_schema) outputs need gpt-4o-2024-08-06 or later
+    openai_model: str = "gpt-4o"
+    openai_max_tokens: int = 800
+    openai_max_attempts: int = 2
+    # Cache of analyses keyed on the normalized transcript
+    analysis_cache_max_entries: int = 5000
+    analysis_cache_ttl_seconds: float = 3600.0
+    analysis_cache_dir: Optional[str] = None
+    # Outbound LLM request scheduling
+    llm_requests_per_minute: int = 500
+    llm_burst: int = 20
+    llm_initial_concurrency: int = 8
+    llm_min_concurrency: int = 1
+    llm_max_concurrency: int = 32
+    llm_target_latency_seconds: float = 15.0
+    llm_max_retries: int = 4
+    # Geocoding; point geocoder_url at tools/geocoder_stub.py for local testing
+    geocoder_url: str = "https://nominatim.openstreetmap.org/search"
+    geocoder_timeout_seconds: float = 5.0
+    geocoder_max_connections: int = 4
+    geocoder_cache_max_entries: int = 10000
+    geocoder_cache_ttl_seconds: float = 86400.0
+    geocoder_negative_ttl_seconds: float = 3600.0
+    # SQLite index built with `python -m app.services.gazetteer build`
+    gazetteer_path: Optional[str] = None
+    # Post-call persistence and enrichment
+    post_call_workers: int = 4
+    post_call_max_attempts: int = 5
+    post_call_jobs_collection: str = "post_call_jobs"
     mongodb_url:str
     mongodb_db_name:str
     mongodb_collection_name:str
+    mongodb_units_collection_name: str = "units"
+    mongodb_max_pool_size: int = 50
+    mongodb_min_pool_size: int = 5
+    mongodb_max_idle_time_ms: int = 60000
+    mongodb_server_selection_timeout_ms: int = 5000
+    # Create missing indexes on startup
+    mongodb_ensure_indexes: bool = True
+    # Delta sync (/emergencies/changes, /units/changes)
+    changes_max_page_size: int = 500
+    changes_overlap_seconds: float = 2.0
+    # Events buffered per /ws/dashboard client before it is told to resync
+    dashboard_subscriber_queue_size: int = 256
+    dashboard_heartbeat_seconds: float = 15.0
+    # In-process grid of unit positions for nearest-unit dispatch
+    unit_grid_cell_degrees: float = 0.05
+    unit_grid_refresh_seconds: float = 60.0
+    # How often the /units/summary counters are recounted from Mongo
+    units_summary_reconcile_seconds: float = 30.0
+    # Finished analyses kept for GET /api/analysis/{call_id}
+    analysis_store_max_entries: int = 1000
+    analysis_store_ttl_seconds: float = 3600.0
+    # Twilio sends 20 ms media frames; this many are transcoded per SDK write
+    audio_frames_per_write: int = 4
+    # Speech recognition concurrency
+    speech_max_concurrent_calls: int = 32
+    speech_pool_size: int = 4
+    speech_pool_max_idle_seconds: float = 180.0
+    # Transcript persistence
+    transcript_dir: str = "transcripts"
+    transcript_flush_interval_seconds: float = 2.0
+    transcript_flush_max_pending: int = 200
+    transcript_retention_days: int = 30
+    # Re-analyze calls while they are in progress
+    incremental_analysis_enabled: bool = True
+    incremental_analysis_min_interval_seconds: float = 5.0
+    incremental_analysis_min_new_chars: int = 200
+    # JSON file of {"keyword": {"emergency_type": ..., "priority": ...}}; built-in list when unset
+    pretriage_lexicon_path: Optional[str] = None
     class Config:
         env_file = ".env"
 
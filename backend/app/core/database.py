@@ -0,0 +1,62 @@
+# backend/app/core/database.py
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+
+
+class Database:
+    """The process-wide MongoDB connection pool.
+
+    Everything that talks to Mongo goes through this one client so a worker
+    holds a single, bounded pool instead of one per module. The client is
+    created on first use so it binds to the running event loop.
+    """
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = AsyncIOMotorClient(
+                settings.mongodb_url,
+                maxPoolSize=settings.mongodb_max_pool_size,
+                minPoolSize=settings.mongodb_min_pool_size,
+                maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+                serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+                retryWrites=True,
+                appname="alertai",
+            )
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[settings.mongodb_db_name]
+
+    @property
+    def emergencies(self):
+        return self.db[settings.mongodb_collection_name]
+
+    @property
+    def units(self):
+        return self.db[settings.mongodb_units_collection_name]
+
+    def collection(self, name):
+        return self.db[name]
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+database = Database()
+
+
+# FastAPI dependencies
+async def get_emergencies_collection():
+    return database.emergencies
+
+
+async def get_units_collection():
+    return database.units
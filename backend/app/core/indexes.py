@@ -0,0 +1,103 @@
+# backend/app/core/indexes.py
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import PyMongoError
+from app.core.config import settings
+from app.core.database import database
+import logging
+
+
+def index_models():
+    """Indexes every collection is expected to have, keyed by collection name."""
+    return {
+        settings.mongodb_collection_name: [
+            IndexModel([("call_id", ASCENDING)], name="call_id_unique", unique=True),
+            # Dashboard ordering: status, then priority, newest first
+            IndexModel([("status", ASCENDING), ("priority", ASCENDING), ("time", DESCENDING)],
+                       name="status_priority_time"),
+            # Paginated list: unassigned first, then HIGH..LOW, newest first
+            IndexModel([("unassigned", DESCENDING), ("priority_rank", ASCENDING),
+                        ("time", DESCENDING), ("_id", DESCENDING)], name="dashboard_order"),
+            IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at"),
+        ],
+        settings.mongodb_units_collection_name: [
+            IndexModel([("unit_id", ASCENDING)], name="unit_id_unique", unique=True),
+            IndexModel([("type", ASCENDING), ("status", ASCENDING)], name="type_status"),
+            # Nearest-unit dispatch; $geoNear filters on type and status from the same index
+            IndexModel([("position", GEOSPHERE), ("type", ASCENDING), ("status", ASCENDING)],
+                       name="position_2dsphere"),
+            IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at"),
+        ],
+        settings.post_call_jobs_collection: [
+            IndexModel([("status", ASCENDING)], name="status"),
+        ],
+    }
+
+
+async def ensure_indexes():
+    """Create any missing indexes. Existing ones are left alone, so this is cheap
+    to run on every startup; a failure is logged and never blocks the app."""
+    for name, models in index_models().items():
+        collection = database.collection(name)
+        for model in models:
+            try:
+                await collection.create_indexes([model])
+            except PyMongoError as e:
+                # Usually duplicate call_id/unit_id values left over from before the
+                # unique index existed; they have to be cleaned up by hand
+                logging.error(f"Error creating index {model.document['name']} on {name}: {str(e)}")
+    logging.info("MongoDB indexes ensured")
+
+
+def _query_plans():
+    emergencies = database.emergencies
+    units = database.units
+    return {
+        "emergency_by_call_id": emergencies.find({"call_id": ""}),
+        "emergencies_dashboard": emergencies.find({}).sort(
+            [("unassigned", DESCENDING), ("priority_rank", ASCENDING), ("time", DESCENDING), ("_id", DESCENDING)]
+        ).limit(50),
+        "available_units_by_type": units.find({"type": "police", "status": "available"}),
+        "unit_by_unit_id": units.find({"unit_id": ""}),
+    }
+
+
+def _summarize_plan(explain):
+    stages = []
+    indexes = []
+    stage = explain.get("queryPlanner", {}).get("winningPlan", {})
+    # Newer servers wrap the classic plan in queryPlan
+    stage = stage.get("queryPlan", stage)
+    while stage:
+        stages.append(stage.get("stage"))
+        if stage.get("indexName"):
+            indexes.append(stage["indexName"])
+        stage = stage.get("inputStage")
+    execution = explain.get("executionStats", {})
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "keys_examined": execution.get("totalKeysExamined"),
+        "docs_examined": execution.get("totalDocsExamined"),
+        "returned": execution.get("nReturned"),
+        "time_ms": execution.get("executionTimeMillis"),
+    }
+
+
+async def index_report():
+    """Index usage counters and winning plans for the hot queries."""
+    report = {"indexes": {}, "plans": {}}
+    for name in index_models():
+        try:
+            stats = await database.collection(name).aggregate([{"$indexStats": {}}]).to_list(length=None)
+            report["indexes"][name] = [
+                {"name": s["name"], "key": s["key"], "ops": s.get("accesses", {}).get("ops")} for s in stats
+            ]
+        except PyMongoError as e:
+            report["indexes"][name] = {"error": str(e)}
+    for name, cursor in _query_plans().items():
+        try:
+            report["plans"][name] = _summarize_plan(await cursor.explain())
+        except PyMongoError as e:
+            report["plans"][name] = {"error": str(e)}
+    return report
@@ -0,0 +1,119 @@
+# backend/app/services/analysis_cache.py
+
+from app.core.config import settings
+from app.services.ttl_cache import TTLCache
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "mm", "like", "okay", "ok", "so", "well"}
+FILLER_PHRASES = ("you know", "i mean")
+_NON_WORD = re.compile(r"[^a-z0-9' ]+")
+
+
+def normalize_transcript(text):
+    """Lower-case, strip punctuation and filler words, collapse whitespace."""
+    text = _NON_WORD.sub(" ", (text or "").lower())
+    for phrase in FILLER_PHRASES:
+        text = re.sub(rf"\b{phrase}\b", " ", text)
+    return " ".join(word for word in text.split() if word not in FILLER_WORDS)
+
+
+class AnalysisCache:
+    """Content-addressed cache of LLM analyses.
+
+    Entries live in an in-process LRU/TTL tier and, when ``disk_dir`` is set,
+    in a JSON-file tier that survives restarts and is shared across workers.
+    """
+
+    def __init__(self, max_entries=5000, ttl_seconds=3600.0, disk_dir=None):
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(operation, *parts):
+        digest = hashlib.sha256(f"{settings.openai_model}\0{operation}".encode())
+        for part in parts:
+            digest.update(b"\0")
+            digest.update(part.encode())
+        return digest.hexdigest()
+
+    async def get(self, key):
+        # Callers enrich the analysis they get back, so hand out copies
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return dict(value)
+        if self.disk_dir:
+            value = await asyncio.to_thread(self._read_disk, key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return dict(value)
+        self.misses += 1
+        return None
+
+    async def set(self, key, value):
+        value = dict(value)
+        self.memory.set(key, value)
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, value)
+            except Exception as e:
+                logging.error(f"Error writing analysis cache entry to disk: {str(e)}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory": self.memory.stats(),
+            "disk_enabled": bool(self.disk_dir),
+        }
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r") as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable analysis cache entry {path}: {str(e)}")
+            return None
+        if time.time() - entry.get("stored_at", 0) > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def _write_disk(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"stored_at": time.time(), "value": value}, file)
+        os.replace(tmp_path, path)
+
+
+analysis_cache = AnalysisCache(
+    max_entries=settings.analysis_cache_max_entries,
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+    disk_dir=settings.analysis_cache_dir,
+)
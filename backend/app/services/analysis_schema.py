@@ -0,0 +1,43 @@
+# backend/app/services/analysis_schema.py
+
+from pydantic import BaseModel
+from typing import Literal
+
+
+class EmergencyAnalysis(BaseModel):
+    # Field order is the order the model is asked to produce them in, so the
+    # fields the dashboard needs first come first in the stream.
+    priority: Literal["LOW", "MEDIUM", "HIGH"]
+    emergency_type: str
+    location: str
+    caller_name: str
+    critical_info: str
+    priority_explanation: str
+    recommended_actions: str
+
+
+def strict_json_schema(model):
+    """JSON schema for ``model`` in the form OpenAI structured outputs accept with strict=True."""
+    properties = {}
+    for name, field in model.model_fields.items():
+        choices = getattr(field.annotation, "__args__", None)
+        if choices:
+            properties[name] = {"type": "string", "enum": list(choices)}
+        else:
+            properties[name] = {"type": "string"}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+EMERGENCY_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "emergency_analysis",
+        "strict": True,
+        "schema": strict_json_schema(EmergencyAnalysis),
+    },
+}
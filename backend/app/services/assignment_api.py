@@ -1,54 +1,59 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from pymongo import MongoClient
-from datetime import datetime
+from pydantic import BaseModel, Field, conint
+from typing import Dict, Literal
 
-router = APIRouter()
+from app.services.units_service import units_service, UnitsUnavailable, EmergencyNotFound
 
-# --- Database connection ---
-MONGODB_URI = "mongo_db_url"
-DATABASE_NAME = "alertai"
+router = APIRouter()
 
-client = MongoClient(MONGODB_URI)
-db = client[DATABASE_NAME]
+# Upper bounds for one dispatch request
+MAX_UNITS_PER_TYPE = 20
+MAX_UNIT_TYPES = 10
 
 class AssignUnitRequest(BaseModel):
     call_id: str
     unit_type: str
 
+class DispatchRequest(BaseModel):
+    call_id: str
+    # Unit type -> how many units of that type to send
+    units: Dict[str, conint(ge=1, le=MAX_UNITS_PER_TYPE)] = Field(..., min_length=1, max_length=MAX_UNIT_TYPES)
+    # "nearest" picks the closest available units to the emergency's coordinates
+    mode: Literal["any", "nearest"] = "any"
+
+async def _dispatch(call_id, requested, mode):
+    try:
+        return await units_service.dispatch(call_id, requested, mode)
+    except UnitsUnavailable as e:
+        raise HTTPException(status_code=409, detail=f"Not enough available units: {e}")
+    except EmergencyNotFound:
+        raise HTTPException(status_code=404, detail="Emergency not found")
+
+@router.post("/dispatch")
+async def dispatch(req: DispatchRequest):
+    """Claim several units, of one or more types, for an emergency in one step.
+
+    Either every requested unit is assigned or none is.
+    """
+    assigned = await _dispatch(req.call_id, req.units, req.mode)
+    return {
+        "success": True,
+        "call_id": req.call_id,
+        "assigned_units": assigned
+    }
+
 @router.post("/assign_unit")
-def assign_unit(req: AssignUnitRequest):
-    call_id = req.call_id
-    unit_type = req.unit_type
-
-    # Find the first available unit of the requested type
-    unit = db.units.find_one({"type": unit_type, "status": "available"})
-    if not unit:
-        raise HTTPException(status_code=404, detail=f"No available unit of type {unit_type}")
-
-    unit_id = unit["unit_id"]
-
-    # 1. Set the unit status to "ASSIGNED"
-    unit_result = db.units.update_one(
-        {"unit_id": unit_id},
-        {"$set": {"status": "ASSIGNED", "last_updated": datetime.utcnow()}}
-    )
-    if unit_result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Unit not found")
-
-    # 2. Assign the unit to the emergency and update its status to ASSIGNED
-    # Store as an object with both id and type!
-    emer_result = db.emergency_calls.update_one(
-        {"call_id": call_id},
-        {"$addToSet": {"assigned_unit": {"unit_id": unit_id, "unit_type": unit_type}},
-         "$set": {"status": "ASSIGNED"}}
-    )
-    if emer_result.matched_count == 0:
+async def assign_unit(req: AssignUnitRequest):
+    try:
+        assigned = await units_service.dispatch(req.call_id, {req.unit_type: 1})
+    except UnitsUnavailable:
+        raise HTTPException(status_code=404, detail=f"No available unit of type {req.unit_type}")
+    except EmergencyNotFound:
         raise HTTPException(status_code=404, detail="Emergency not found")
 
     return {
         "success": True,
-        "call_id": call_id,
-        "assigned_unit": unit_id,
-        "unit_type": unit_type
+        "call_id": req.call_id,
+        "assigned_unit": assigned[0]["unit_id"],
+        "unit_type": req.unit_type
     }
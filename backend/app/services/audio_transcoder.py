@@ -0,0 +1,88 @@
+# backend/app/services/audio_transcoder.py
+
+import base64
+import numpy as np
+
+
+def _build_ulaw_table():
+    # G.711 mu-law expansion, bit-exact with audioop.ulaw2lin(..., 2)
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+ULAW_TO_LINEAR = _build_ulaw_table()
+
+
+def ulaw_to_linear(data):
+    """Decode mu-law bytes to an int16 numpy array."""
+    return ULAW_TO_LINEAR[np.frombuffer(data, dtype=np.uint8)]
+
+
+class PolyphaseUpsampler:
+    """Integer-factor FIR upsampler that carries filter state across calls.
+
+    Splitting the anti-imaging filter into ``factor`` phases means every output
+    sample costs ``taps_per_phase`` multiply-adds instead of filtering a
+    zero-stuffed signal, and keeping the tail of the previous input avoids
+    clicks at frame boundaries.
+    """
+
+    def __init__(self, factor=2, taps_per_phase=16, cutoff=0.45, kaiser_beta=8.0):
+        self.factor = factor
+        num_taps = factor * taps_per_phase
+        # Cutoff is a fraction of the input Nyquist frequency
+        fc = cutoff / factor
+        n = np.arange(num_taps) - (num_taps - 1) / 2
+        taps = 2 * fc * np.sinc(2 * fc * n) * np.kaiser(num_taps, kaiser_beta)
+        taps *= factor / taps.sum()
+        self.phases = [taps[p::factor].copy() for p in range(factor)]
+        self._history = np.zeros(taps_per_phase - 1)
+
+    def process(self, samples):
+        if len(samples) == 0:
+            return np.zeros(0)
+        x = np.concatenate((self._history, samples))
+        out = np.empty((len(samples), self.factor))
+        for p, phase in enumerate(self.phases):
+            out[:, p] = np.convolve(x, phase, mode="valid")
+        self._history = x[len(x) - len(self._history):]
+        return out.reshape(-1)
+
+
+class MulawTranscoder:
+    """Turns base64 mu-law Twilio media payloads into PCM for the speech SDK.
+
+    Payloads are buffered until ``frames_per_write`` of them have arrived and
+    then decoded and resampled in a single vectorized pass.
+    """
+
+    def __init__(self, frames_per_write=4, input_rate=8000, output_rate=16000):
+        if output_rate % input_rate:
+            raise ValueError("output_rate must be an integer multiple of input_rate")
+        self.frames_per_write = max(1, frames_per_write)
+        self.upsampler = PolyphaseUpsampler(factor=output_rate // input_rate)
+        self._pending = bytearray()
+        self._pending_frames = 0
+
+    def push(self, payload):
+        """Buffer one base64 payload; return PCM bytes once a batch is full, else None."""
+        self._pending += base64.b64decode(payload)
+        self._pending_frames += 1
+        if self._pending_frames >= self.frames_per_write:
+            return self.flush()
+        return None
+
+    def flush(self):
+        """Transcode whatever is buffered and return it as 16-bit PCM bytes."""
+        if not self._pending:
+            return b""
+        linear = ulaw_to_linear(bytes(self._pending))
+        self._pending.clear()
+        self._pending_frames = 0
+        resampled = self.upsampler.process(linear)
+        np.rint(resampled, out=resampled)
+        np.clip(resampled, -32768, 32767, out=resampled)
+        return resampled.astype("<i2").tobytes()
@@ -2,32 +2,48 @@
 
 import azure.cognitiveservices.speech as speechsdk
 from app.core.config import settings
-import base64
-import audioop
+from app.services.audio_transcoder import MulawTranscoder
+from app.services.recognizer_pool import RecognizerPool
 import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor
-import os
 
 class AzureSpeechService:
     def __init__(self):
         self.speech_config = speechsdk.SpeechConfig(subscription=settings.speech_key, region=settings.speech_region)
         self.speech_config.speech_recognition_language = "en-US"
-        self.executor = ThreadPoolExecutor(max_workers=1)
+        # start/stop_continuous_recognition block until the service answers, so
+        # every concurrent call needs its own worker or calls queue behind each other
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.speech_max_concurrent_calls,
+            thread_name_prefix="speech",
+        )
+        self.pool = RecognizerPool(
+            self.speech_config,
+            self.executor,
+            size=settings.speech_pool_size,
+            max_idle_seconds=settings.speech_pool_max_idle_seconds,
+        )
 
-    async def transcribe_stream(self, audio_queue, result_queue, transcript_file):
+    async def start(self):
+        self.pool.start()
+
+    async def shutdown(self):
+        await self.pool.close()
+        self.executor.shutdown(wait=False)
+
+    async def transcribe_stream(self, audio_queue, result_queue):
         logging.info("Starting new transcription stream")
-        audio_stream = speechsdk.audio.PushAudioInputStream()
-        audio_config = speechsdk.audio.AudioConfig(stream=audio_stream)
-        speech_recognizer = speechsdk.SpeechRecognizer(speech_config=self.speech_config, audio_config=audio_config)
+        recognizer_session = await self.pool.acquire()
+        audio_stream = recognizer_session.audio_stream
+        speech_recognizer = recognizer_session.recognizer
 
         loop = asyncio.get_running_loop()
+        transcoder = MulawTranscoder(frames_per_write=settings.audio_frames_per_write)
 
         def recognized_callback(event):
             if event.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                text = event.result.text
-                asyncio.run_coroutine_threadsafe(self.write_to_file(transcript_file, text), loop)
-                asyncio.run_coroutine_threadsafe(result_queue.put(text), loop)
+                loop.call_soon_threadsafe(result_queue.put_nowait, event.result.text)
 
         speech_recognizer.recognized.connect(recognized_callback)
 
@@ -39,23 +55,19 @@ class AzureSpeechService:
                 audio_chunk = await audio_queue.get()
                 if audio_chunk is None:  # None is our signal to stop
                     break
-                audio = base64.b64decode(audio_chunk)
-                audio = audioop.ulaw2lin(audio, 2)
-                audio = audioop.ratecv(audio, 2, 1, 8000, 16000, None)[0]
+                audio = transcoder.push(audio_chunk)
+                if audio:
+                    audio_stream.write(audio)
+            audio = transcoder.flush()
+            if audio:
                 audio_stream.write(audio)
         finally:
             # Stop recognition
             await loop.run_in_executor(self.executor, speech_recognizer.stop_continuous_recognition)
-            audio_stream.close()
+            await self.pool.release(recognizer_session)
             logging.info("Transcription stream closed")
 
         # Signal that transcription is complete
         await result_queue.put(None)
 
-    async def write_to_file(self, file_path, text):
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'a') as file:
-            file.write(text + " ")
-        logging.info(f"Appended to transcript: {text}")
-
 azure_speech_service = AzureSpeechService()
\ No newline at end of file
@@ -0,0 +1,68 @@
+# backend/app/services/call_session.py
+
+from datetime import datetime
+import asyncio
+import time
+import uuid
+
+
+def new_call_id():
+    # The timestamp prefix keeps ids sortable; the suffix keeps calls that start
+    # in the same second apart.
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+class CallSession:
+    """State owned by a single Twilio media stream."""
+
+    __slots__ = (
+        "call_id",
+        "audio_queue",
+        "result_queue",
+        "transcript_parts",
+        "transcript_file",
+        "started_at",
+        "first_transcript_at",
+        "ended_at",
+        "analyzer",
+        "pretriage",
+        "socket_open",
+        "streamed_fields",
+    )
+
+    def __init__(self, call_id=None):
+        self.call_id = call_id or new_call_id()
+        self.audio_queue = asyncio.Queue()
+        self.result_queue = asyncio.Queue()
+        self.transcript_parts = []
+        self.transcript_file = None
+        self.started_at = time.monotonic()
+        self.first_transcript_at = None
+        self.ended_at = None
+        self.analyzer = None
+        self.pretriage = None
+        # Cleared on the first failed send; the call itself carries on
+        self.socket_open = True
+        # Latest value of each analysis field streamed by the LLM
+        self.streamed_fields = {}
+
+    def append_transcript(self, text):
+        if self.first_transcript_at is None:
+            self.first_transcript_at = time.monotonic()
+        self.transcript_parts.append(text)
+
+    @property
+    def transcript(self):
+        return " ".join(self.transcript_parts)
+
+    def mark_ended(self):
+        if self.ended_at is None:
+            self.ended_at = time.monotonic()
+
+    def timings(self):
+        end = self.ended_at if self.ended_at is not None else time.monotonic()
+        first = self.first_transcript_at
+        return {
+            "duration_seconds": round(end - self.started_at, 3),
+            "time_to_first_transcript_seconds": None if first is None else round(first - self.started_at, 3),
+        }
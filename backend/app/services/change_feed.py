@@ -0,0 +1,77 @@
+# backend/app/services/change_feed.py
+
+from fastapi import HTTPException
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+import base64
+import json
+import logging
+
+# Every writer stamps updated_at; the changes endpoints read it through the
+# (updated_at, _id) index
+SORT = [("updated_at", ASCENDING), ("_id", ASCENDING)]
+
+
+def encode_token(updated_at, _id, read_at):
+    key = {"t": updated_at.isoformat(), "id": str(_id), "r": read_at.isoformat() if read_at else None}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_token(token):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode()))
+        read_at = datetime.fromisoformat(key["r"]) if key.get("r") else None
+        return datetime.fromisoformat(key["t"]), ObjectId(key["id"]), read_at
+    except (ValueError, TypeError, KeyError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid change token")
+
+
+async def read_changes(collection, since, limit, overlap_seconds, projection=None):
+    """Documents written after the position in ``since`` (all of them when None).
+
+    A token holds the (updated_at, _id) of the last document returned and
+    when the read happened. Writers take their timestamp before the write
+    lands, so a document can show up late with an updated_at older than one
+    already returned; resuming also re-reads anything stamped within
+    ``overlap_seconds`` of the previous read. Clients apply changes by key,
+    so seeing a document twice is harmless. Tokens handed out mid page walk
+    (``has_more``) carry no read time and resume exactly.
+    Returns ``(docs, next_token, has_more)``.
+    """
+    read_at = datetime.utcnow()
+    query = {}
+    anchor = None
+    if since:
+        updated_at, _id, previous_read_at = decode_token(since)
+        anchor = (updated_at, _id)
+        query = {"$or": [{"updated_at": {"$gt": updated_at}},
+                         {"updated_at": updated_at, "_id": {"$gt": _id}}]}
+        if previous_read_at:
+            query["$or"].append({"updated_at": {"$gte": previous_read_at - timedelta(seconds=overlap_seconds)}})
+    if projection is not None:
+        projection = {**projection, "updated_at": 1}
+    docs = await collection.find(query, projection).sort(SORT).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    # Documents missing updated_at (not yet backfilled) cannot anchor a token
+    for doc in reversed(docs):
+        if isinstance(doc.get("updated_at"), datetime) and (anchor is None or (doc["updated_at"], doc["_id"]) > anchor):
+            anchor = (doc["updated_at"], doc["_id"])
+            break
+    next_token = encode_token(*anchor, None if has_more else read_at) if anchor else None
+    return docs, next_token, has_more
+
+
+async def backfill_updated_at(collection, fallback_field):
+    """Stamp updated_at on documents written before the field existed."""
+    try:
+        result = await collection.update_many(
+            {"updated_at": {"$exists": False}},
+            [{"$set": {"updated_at": {"$ifNull": [f"${fallback_field}", "$$NOW"]}}}],
+        )
+        if result.modified_count:
+            logging.info(f"Backfilled updated_at on {result.modified_count} {collection.name} document(s)")
+    except Exception as e:
+        logging.error(f"Error backfilling updated_at on {collection.name}: {str(e)}")
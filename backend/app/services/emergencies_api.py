@@ -1,23 +1,22 @@
 # emergencies_api.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
 from bson import ObjectId
-import os
-
-# ---- CONFIG ----
-MONGODB_URI = os.getenv(
-    "MONGODB_URI",
-    "mongo_db_url"
-)
-DB_NAME = os.getenv("DB_NAME", "alertai")
-COLLECTION_NAME = os.getenv("COLLECTION_NAME", "emergency_calls")
+from bson.errors import InvalidId
+from datetime import datetime
+from typing import Optional
+from pymongo import ASCENDING, DESCENDING
+import base64
+import json
+import re
 
 # ---- DB CONNECTION ----
-client = MongoClient(MONGODB_URI)
-db = client[DB_NAME]
-collection = db[COLLECTION_NAME]
+# Shared pool from app.core.database; configured through settings
+from app.core.config import settings
+from app.core.database import get_emergencies_collection
+from app.services.change_feed import read_changes
+from app.services.mongodb_service import LIST_FIELDS, serialize_emergency
 
 # ---- FASTAPI APP ----
 
@@ -28,36 +27,101 @@ router = APIRouter()
 #     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
 # )
 
-# ---- SERIALIZATION HELPER ----
-
-def serialize_emergency(doc):
-    doc = dict(doc)
-    doc['id'] = str(doc.get('_id', ''))
-    doc.pop('_id', None)
-    # Map Mongo fields to frontend keys
-    doc['call_id'] = doc.get('call_id', '')
-    doc['emergency_type'] = doc.get('emergency_type', '')
-    doc['priority'] = doc.get('priority', 'LOW')
-    doc['caller_name'] = doc.get('caller_name', '')
-    doc['status'] = doc.get('status', 'OPEN')
-    doc['location'] = doc.get('location', '')
-    doc['latitude'] = doc.get('latitude', '')
-    doc['longitude'] = doc.get('longitude', '')
-    doc['transcript'] = doc.get('transcript', '')
-    doc['ai_recommendation'] = doc.get('ai_recommendation', doc.get('recommended_actions', ''))
-    # Add any other field mapping if needed
-    return doc
+# ---- LIST VIEW ----
+
+# Served by the dashboard_order index: unassigned first, then HIGH..LOW, newest first
+SORT = [("unassigned", DESCENDING), ("priority_rank", ASCENDING), ("time", DESCENDING), ("_id", DESCENDING)]
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(doc):
+    time = doc.get("time")
+    key = [doc.get("unassigned"), doc.get("priority_rank"),
+           time.isoformat() if isinstance(time, datetime) else None, str(doc["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        unassigned, rank, time, _id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return [unassigned, rank, datetime.fromisoformat(time) if time else None, ObjectId(_id)]
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def after_cursor(values):
+    """Keyset condition matching documents that sort strictly after ``values``."""
+    clauses = []
+    for i, (field, direction) in enumerate(SORT):
+        clause = {f: v for (f, _), v in zip(SORT[:i], values[:i])}
+        clause[field] = {"$lt" if direction == DESCENDING else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
 
 # ---- API ENDPOINTS ----
 
 @router.get("/emergencies")
-def get_all_emergencies():
-    emergencies = [serialize_emergency(doc) for doc in collection.find()]
-    return {"emergencies": emergencies}
+async def get_all_emergencies(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    emergency_type: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    view: str = Query("list", pattern="^(list|full)$"),
+    collection=Depends(get_emergencies_collection),
+):
+    filters = {}
+    if status:
+        filters["status"] = {"$in": list({status, status.lower(), status.upper()})}
+    if priority:
+        filters["priority"] = priority.upper()
+    if emergency_type:
+        filters["emergency_type"] = {"$regex": re.escape(emergency_type), "$options": "i"}
+    if q:
+        # Substring match on caller or location; narrow with status/priority first on big collections
+        pattern = {"$regex": re.escape(q), "$options": "i"}
+        filters["$or"] = [{"caller_name": pattern}, {"location": pattern}]
+    if since or until:
+        filters["time"] = {k: v for k, v in (("$gte", since), ("$lt", until)) if v}
+
+    query = dict(filters)
+    if cursor:
+        query = {"$and": [filters, after_cursor(decode_cursor(cursor))]}
+    projection = LIST_FIELDS if view == "list" else None
+    docs = await collection.find(query, projection).sort(SORT).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    response = {
+        "emergencies": [serialize_emergency(doc, full=view == "full") for doc in docs[:limit]],
+        "next_cursor": next_cursor,
+    }
+    # Totals only come with the first page; both counts are covered by the index prefix
+    if not cursor:
+        response["counts"] = {
+            "unassigned": await collection.count_documents({**filters, "unassigned": True}),
+            "assigned": await collection.count_documents({**filters, "unassigned": False}),
+        }
+    return response
+
+@router.get("/emergencies/changes")
+async def get_emergency_changes(
+    since: Optional[str] = None,
+    limit: int = Query(settings.changes_max_page_size, ge=1, le=settings.changes_max_page_size),
+    collection=Depends(get_emergencies_collection),
+):
+    """List-view records written since a change token; omit ``since`` for a full read."""
+    docs, next_token, has_more = await read_changes(
+        collection, since, limit, settings.changes_overlap_seconds, LIST_FIELDS
+    )
+    return {
+        "emergencies": [serialize_emergency(doc, full=False) for doc in docs],
+        "next": next_token,
+        "has_more": has_more,
+    }
 
 @router.get("/emergencies/by_call_id/{call_id}")
-def get_emergency_by_call_id(call_id: str):
-    doc = collection.find_one({"call_id": call_id})
+async def get_emergency_by_call_id(call_id: str, collection=Depends(get_emergencies_collection)):
+    doc = await collection.find_one({"call_id": call_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Emergency not found")
     return serialize_emergency(doc)
@@ -66,7 +130,7 @@ def get_emergency_by_call_id(call_id: str):
 # http://localhost:8000/emergencies/by_call_id/CALL_1000
 
 @router.get("/")
-def root():
+async def root():
     return {"message": "AlertAI Emergencies API working!"}
 
 # ---- RUN with: uvicorn emergencies_api:app --reload --port 8000 ----
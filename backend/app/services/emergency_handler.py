@@ -1,111 +1,207 @@
 # backend/app/services/emergency_handler.py
 
 from app.services.azure_speech_service import azure_speech_service
-from app.services.openai_service import openai_service
 from app.services.mongodb_service import mongodb_service
-from app.services.geolocation_service import geolocation_service
+from app.services.post_call_pipeline import post_call_pipeline
+from app.services.call_session import CallSession
+from app.services.incremental_analyzer import IncrementalAnalyzer
+from app.services.pretriage import TriageEstimate, pretriage_classifier
+from app.services.transcript_writer import transcript_writer
+from app.services.ttl_cache import TTLCache
+from app.core.config import settings
 import asyncio
 import logging
-import os
-from datetime import datetime
 from starlette.websockets import WebSocketDisconnect
 
 class EmergencyHandler:
     def __init__(self):
-        self.transcript_file = None
-        self.analysis_results = {}
+        # Calls in flight, keyed by call_id. Each call owns its own CallSession so
+        # overlapping calls never share queues or transcript state.
+        self.sessions = {}
+        self._background_tasks = set()
+        self.analysis_results = TTLCache(
+            max_entries=settings.analysis_store_max_entries,
+            ttl_seconds=settings.analysis_store_ttl_seconds,
+        )
 
     async def handle_call(self, websocket):
-        call_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        audio_queue = asyncio.Queue()
-        result_queue = asyncio.Queue()
-
-        self.transcript_file = f"transcripts/transcript_{call_id}.txt"
-        os.makedirs(os.path.dirname(self.transcript_file), exist_ok=True)
+        session = CallSession()
+        call_id = session.call_id
+        self.sessions[call_id] = session
+        audio_queue = session.audio_queue
+        session.transcript_file = transcript_writer.path_for(call_id)
+        session.analyzer = IncrementalAnalyzer(
+            session,
+            on_result=lambda analysis, final: self.publish_interim_analysis(websocket, session, analysis, final),
+            on_field=lambda key, value: self.publish_analysis_field(websocket, session, key, value),
+            min_interval=settings.incremental_analysis_min_interval_seconds,
+            min_new_chars=settings.incremental_analysis_min_new_chars,
+        )
+        session.pretriage = TriageEstimate(pretriage_classifier)
 
         transcription_task = asyncio.create_task(
-            azure_speech_service.transcribe_stream(audio_queue, result_queue, self.transcript_file)
+            azure_speech_service.transcribe_stream(audio_queue, session.result_queue)
         )
 
-        processing_task = asyncio.create_task(self.process_results(websocket, result_queue))
+        processing_task = asyncio.create_task(self.process_results(websocket, session))
 
         try:
             async for message in websocket.iter_json():
                 if message['event'] == 'media':
                     await audio_queue.put(message['media']['payload'])
                 elif message['event'] == 'stop':
-                    await audio_queue.put(None)  # Signal to stop transcription
                     break
+            # Reached on 'stop' and also when the socket drops (iter_json ends
+            # quietly on disconnect), so the call is always finalized
+            await audio_queue.put(None)  # Signal to stop transcription
 
             await transcription_task
             await processing_task
+            session.mark_ended()
 
-            # Analyze the emergency
-            emergency_data = await openai_service.analyze_emergency(self.transcript_file)
+            # Most of the analysis already ran during the call; only the text
+            # spoken since the last interim pass is still outstanding
+            transcript = session.transcript
+            emergency_data = await session.analyzer.finalize()
             if emergency_data:
-                self.analysis_results[call_id] = emergency_data
-                
-                # Read the transcript
-                with open(self.transcript_file, 'r') as file:
-                    transcript = file.read()
-                # Add coordinates using the new geolocation service
-                emergency_data = await geolocation_service.enrich_with_coordinates(emergency_data)
-                # Insert data into MongoDB
-                mongo_id = await mongodb_service.insert_emergency_data(emergency_data, transcript, call_id)
-                if mongo_id:
-                    logging.info(f"Emergency data inserted into MongoDB with ID: {mongo_id}")
-                    mongo_id_str = str(mongo_id)
-                else:
-                    logging.error("Failed to insert emergency data into MongoDB")
-                    mongo_id_str = "insert_failed"
-
-                try:
-                    await websocket.send_json({
-                        "type": "analysis", 
-                        "data": emergency_data, 
-                        "call_id": call_id,
-                        "mongo_id": mongo_id_str
-                    })
-                    logging.info(f"Emergency analysis sent for call {call_id}")
-                except WebSocketDisconnect:
-                    logging.warning(f"WebSocket disconnected before sending analysis for call {call_id}")
+                if session.pretriage.priority:
+                    estimate = session.pretriage.as_dict()
+                    emergency_data["pretriage"] = estimate
+                    if estimate["priority"] != emergency_data.get("priority"):
+                        logging.info(f"LLM overrode pre-triage priority for call {call_id}: "
+                                     f"{estimate['priority']} -> {emergency_data.get('priority')}")
+                self.analysis_results.set(call_id, emergency_data)
             else:
-                logging.error(f"Failed to analyze emergency for call {call_id}")
+                # LLM retries are exhausted (e.g. a sustained 429 surge). Keep the
+                # call anyway: the pipeline stores what pre-triage knows and
+                # re-runs the analysis with backoff.
+                logging.error(f"Failed to analyze emergency for call {call_id}; queued for re-analysis")
+                emergency_data = self.failed_analysis(session)
 
-            try:
-                await websocket.send_json({"type": "status", "message": "Call handling completed", "call_id": call_id})
-            except WebSocketDisconnect:
-                logging.warning(f"WebSocket disconnected before sending completion status for call {call_id}")
+            # Insert and geocoding run in the post-call pipeline, so neither a
+            # slow stage nor a dropped websocket can hold up or lose the record
+            await post_call_pipeline.submit(call_id, emergency_data, transcript, emergency_data.get("priority"))
+
+            if await self.send(websocket, session, {
+                "type": "analysis",
+                "data": emergency_data,
+                "call_id": call_id,
+                "record_status": "queued"
+            }):
+                logging.info(f"Emergency analysis sent for call {call_id}")
+
+            await self.send(websocket, session, {"type": "status", "message": "Call handling completed", "call_id": call_id})
 
         except WebSocketDisconnect:
             logging.warning(f"WebSocket disconnected during call handling for call {call_id}")
         except Exception as e:
             logging.error(f"Error in handle_call for call {call_id}: {str(e)}", exc_info=True)
         finally:
-            if not transcription_task.done():
-                transcription_task.cancel()
-            try:
-                await transcription_task
-            except asyncio.CancelledError:
-                pass
+            session.mark_ended()
+            session.analyzer.cancel()
+            for task in (transcription_task, processing_task):
+                if not task.done():
+                    task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            self.sessions.pop(call_id, None)
+            logging.info(f"Call {call_id} finished: {session.timings()}")
 
-    async def process_results(self, websocket, result_queue):
+    async def process_results(self, websocket, session):
         while True:
             try:
-                result = await result_queue.get()
+                result = await session.result_queue.get()
                 if result is None:  # Signal that transcription is complete
                     break
-                try:
-                    await websocket.send_json({"type": "transcription", "text": result})
-                except WebSocketDisconnect:
-                    logging.warning("WebSocket disconnected while sending transcription")
-                    break
+                session.append_transcript(result)
+                transcript_writer.append(session.call_id, result)
+                if session.pretriage.update(result):
+                    await self.publish_pretriage(websocket, session)
+                if settings.incremental_analysis_enabled:
+                    session.analyzer.notify()
+                # A dropped socket only stops the live echo; every utterance up
+                # to the None sentinel still belongs in the transcript
+                await self.send(websocket, session, {"type": "transcription", "text": result})
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logging.error(f"Error processing result: {str(e)}", exc_info=True)
-                break
-        logging.info(f"Transcription saved to {self.transcript_file}")
+        logging.info(f"Transcription for call {session.call_id} buffered for {session.transcript_file}")
+
+    def failed_analysis(self, session):
+        """Placeholder record for a call the LLM could not analyze."""
+        estimate = session.pretriage.as_dict()
+        return {
+            "emergency_type": estimate["emergency_type"],
+            "priority": estimate["priority"],
+            "critical_info": "Automatic analysis failed; review the transcript.",
+            "pretriage": estimate if estimate["priority"] else None,
+            "analysis_status": "failed",
+        }
+
+    async def send(self, websocket, session, message):
+        """Send ``message`` to the call's socket; returns False once it has closed.
+
+        Starlette raises WebSocketDisconnect on the first send to a dropped
+        socket and RuntimeError on every send after that. Both just mark the
+        socket closed so nothing else is sent; the call carries on.
+        """
+        if not session.socket_open:
+            return False
+        try:
+            await websocket.send_json(message)
+            return True
+        except (WebSocketDisconnect, RuntimeError) as e:
+            session.socket_open = False
+            logging.warning(f"WebSocket closed for call {session.call_id} while sending {message.get('type')}; "
+                            f"no further updates will be sent: {str(e)}")
+            return False
+
+    async def publish_pretriage(self, websocket, session):
+        call_id = session.call_id
+        estimate = session.pretriage.as_dict()
+        if session.analyzer.analysis is None:
+            self.analysis_results.set(call_id, estimate)
+        if estimate["priority"] == "HIGH":
+            self.publish_provisional(session, estimate)
+        await self.send(websocket, session, {"type": "pretriage", "data": estimate, "call_id": call_id})
+
+    async def publish_analysis_field(self, websocket, session, key, value):
+        # Only the triage fields are worth pushing ahead of the full analysis
+        if key not in ("priority", "emergency_type"):
+            return
+        call_id = session.call_id
+        session.streamed_fields[key] = value
+        # Priority streams before emergency_type; wait for a type (streamed or
+        # from pre-triage) so the dashboard never gets an untyped incident
+        priority = session.streamed_fields.get("priority")
+        emergency_type = session.streamed_fields.get("emergency_type") or session.pretriage.emergency_type
+        if priority == "HIGH" and emergency_type:
+            self.publish_provisional(session, {
+                "emergency_type": emergency_type,
+                "priority": priority,
+                "source": "llm_stream",
+            })
+        await self.send(websocket, session, {"type": "analysis_field", "field": key, "value": value, "call_id": call_id})
+
+    def publish_provisional(self, session, estimate):
+        """Put the call in the dashboard queue now rather than after the LLM round trip."""
+        if session.pretriage.published:
+            return
+        session.pretriage.published = True
+        task = asyncio.create_task(
+            mongodb_service.insert_provisional_emergency(estimate, session.transcript, session.call_id)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def publish_interim_analysis(self, websocket, session, analysis, final):
+        if final:
+            return
+        self.analysis_results.set(session.call_id, analysis)
+        await self.send(websocket, session, {"type": "interim_analysis", "data": analysis, "call_id": session.call_id})
 
     async def get_analysis_result(self, call_id):
         return self.analysis_results.get(call_id)
@@ -0,0 +1,86 @@
+# backend/app/services/event_hub.py
+
+from app.core.config import settings
+from bson import ObjectId
+from datetime import datetime
+import asyncio
+import json
+import logging
+
+# Sent in place of the dropped backlog when a subscriber falls behind; the
+# client answers it by re-reading through the changes endpoints
+RESYNC = json.dumps({"type": "resync"})
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Subscription:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, max_queue):
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    async def get(self, timeout=None):
+        """Next serialized event, or None if nothing arrived within ``timeout``."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """In-process fan-out of dashboard events.
+
+    Each event is serialized once and handed to every subscriber's bounded
+    queue. Publishing never blocks a writer: a subscriber whose queue is full
+    loses its backlog and gets a single resync marker instead, so one slow
+    console cannot hold up the others or grow memory without bound.
+    """
+
+    def __init__(self, max_queue=256):
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self.published = 0
+
+    def subscribe(self):
+        subscription = Subscription(self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type, payload):
+        if not self._subscribers:
+            return
+        try:
+            message = json.dumps({"type": event_type, "data": payload}, default=_encode)
+        except TypeError as e:
+            logging.error(f"Error serializing {event_type} event: {str(e)}")
+            return
+        self.published += 1
+        for subscription in self._subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscription.dropped += subscription.queue.qsize()
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(RESYNC)
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in self._subscribers),
+        }
+
+
+event_hub = EventHub(max_queue=settings.dashboard_subscriber_queue_size)
@@ -0,0 +1,182 @@
+# backend/app/services/gazetteer.py
+#
+# Local geocoding tier backed by an SQLite FTS5 index. Build an index from a
+# CSV with name,latitude,longitude columns (an optional "aliases" column may
+# hold extra names separated by "|"):
+#
+#   python -m app.services.gazetteer build places.csv gazetteer.db
+#   python -m app.services.gazetteer lookup gazetteer.db "12 main st springfield"
+
+import argparse
+import csv
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+_PUNCTUATION = re.compile(r"[^\w,]+")
+ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr", "boulevard": "blvd",
+    "lane": "ln", "court": "ct", "place": "pl", "highway": "hwy", "parkway": "pkwy",
+    "north": "n", "south": "s", "east": "e", "west": "w", "saint": "st", "mount": "mt",
+}
+# Short forms never get a prefix wildcard: "st*" would also match "station"
+ABBREVIATED = set(ABBREVIATIONS.values())
+# Words callers wrap around a place name that never appear in the index
+STOPWORDS = {"the", "a", "an", "at", "in", "on", "of", "near", "by", "next", "to", "behind", "outside", "inside"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS places_key ON places (key);
+CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5 (
+    key, content='places', content_rowid='id', tokenize='unicode61', prefix='2 3 4'
+);
+"""
+
+
+def normalize_location(location):
+    """Lookup key for a free-text location: case, punctuation and spacing folded."""
+    text = _PUNCTUATION.sub(" ", location.lower())
+    parts = (" ".join(ABBREVIATIONS.get(word, word) for word in part.split()) for part in text.split(","))
+    return ", ".join(part for part in parts if part)
+
+
+def build_index(csv_path, db_path, batch_size=10000):
+    """Import a CSV into an on-disk index; returns the number of names indexed."""
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.executescript(SCHEMA)
+        count = 0
+        batch = []
+        with open(csv_path, newline="") as file:
+            for row in csv.DictReader(file):
+                names = [row["name"]] + [a for a in (row.get("aliases") or "").split("|") if a.strip()]
+                for name in names:
+                    key = normalize_location(name)
+                    if key:
+                        batch.append((name.strip(), key, float(row["latitude"]), float(row["longitude"])))
+                if len(batch) >= batch_size:
+                    count += _insert(connection, batch)
+                    batch = []
+        count += _insert(connection, batch)
+        connection.execute("INSERT INTO places_fts(places_fts) VALUES ('rebuild')")
+        connection.execute("INSERT INTO places_fts(places_fts) VALUES ('optimize')")
+        connection.commit()
+        return count
+    finally:
+        connection.close()
+
+
+def _insert(connection, batch):
+    connection.executemany("INSERT INTO places (name, key, latitude, longitude) VALUES (?, ?, ?, ?)", batch)
+    return len(batch)
+
+
+def _tokens(key):
+    return [token for token in key.replace(",", " ").replace('"', "").split() if token]
+
+
+def _fts_query(tokens):
+    # Every token must match; the last one may be a prefix of a longer word
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    if len(tokens[-1]) >= 3 and tokens[-1] not in ABBREVIATED:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _locality(key):
+    """Tokens after the first comma of an indexed key (town, region, ...)."""
+    _, _, rest = key.partition(",")
+    return set(_tokens(rest))
+
+
+def _unambiguous(rows):
+    """Coordinates shared by every row, or None if they disagree (or there are none)."""
+    coordinates = {(row[0], row[1]) for row in rows}
+    return coordinates.pop() if len(coordinates) == 1 else None
+
+
+class Gazetteer:
+    """Read-only lookups against an index produced by ``build_index``.
+
+    Resolution order: exact normalized-name match, then an FTS5 match that
+    requires every token except stopwords. Tokens are never dropped to force
+    a match: the words at the end are usually the locality, and
+    "12 Main St, Springfield" must not resolve to 12 Main St somewhere else.
+    For the same reason a hit only counts if the query names the matched
+    place's locality, and a lookup whose best two hits disagree is treated as
+    ambiguous. Anything that isn't a clear match is left to the network
+    geocoder.
+
+    Lookups are blocking SQLite calls; async callers should run them in a
+    thread. Each thread gets its own read-only connection.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def lookup(self, location):
+        key = normalize_location(location or "")
+        if not key:
+            return None
+        try:
+            connection = self._connection()
+            rows = connection.execute(
+                "SELECT latitude, longitude FROM places WHERE key = ? LIMIT 2", (key,)
+            ).fetchall()
+            if rows:
+                return _unambiguous(rows)
+            tokens = [token for token in _tokens(key) if token not in STOPWORDS]
+            query = _fts_query(tokens)
+            if query is None:
+                return None
+            rows = connection.execute(
+                "SELECT p.latitude, p.longitude, p.key FROM places_fts f JOIN places p ON p.id = f.rowid "
+                "WHERE places_fts MATCH ? ORDER BY bm25(places_fts) LIMIT 2",
+                (query,),
+            ).fetchall()
+            named = set(tokens)
+            if rows and all(_locality(row[2]) <= named for row in rows):
+                return _unambiguous(rows)
+        except sqlite3.Error as e:
+            logging.error(f"Gazetteer lookup failed for {location!r}: {str(e)}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local gazetteer index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build")
+    build.add_argument("csv_path")
+    build.add_argument("db_path")
+    lookup = commands.add_parser("lookup")
+    lookup.add_argument("db_path")
+    lookup.add_argument("location")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"Indexed {build_index(args.csv_path, args.db_path)} names into {args.db_path}")
+    else:
+        print(Gazetteer(args.db_path).lookup(args.location))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,106 @@
 # backend/app/services/geolocation_service.py
 
-import requests
+from app.core.config import settings
+from app.services.ttl_cache import TTLCache
+from app.services.gazetteer import Gazetteer, normalize_location
+import asyncio
+import httpx
 import logging
+import os
+
+NOT_FOUND = ()
+
+
+class GeocoderUnavailable(Exception):
+    """The geocoder could not answer right now (timeout, connection error, 429/5xx)."""
 
 
 class GeoLocationService:
-    def __init__(self):
-        self.api_url = "https://nominatim.openstreetmap.org/search"
+    def __init__(self, api_url="https://nominatim.openstreetmap.org/search", timeout=5.0,
+                 max_connections=4, cache_max_entries=10000, cache_ttl_seconds=86400.0,
+                 negative_ttl_seconds=3600.0, gazetteer=None):
+        self.api_url = api_url
+        self.gazetteer = gazetteer
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.cache = TTLCache(max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
+        self._client = None
+        self._in_flight = {}
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                headers={"User-Agent": "AlertAI"},
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def geocode(self, location):
+        """Return ``(latitude, longitude)`` for a location string, or None if it is unknown.
+
+        Raises GeocoderUnavailable when the network geocoder fails transiently,
+        so callers that can retry (the post-call pipeline) do.
+        """
+        key = normalize_location(location)
+        if not key:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+
+        # The local index answers without touching the network, and keeps
+        # working when the external geocoder is slow or down. SQLite blocks,
+        # so it runs off the event loop.
+        if self.gazetteer is not None:
+            coords = await asyncio.to_thread(self.gazetteer.lookup, location)
+            if coords:
+                self.cache.set(key, coords)
+                return coords
+
+        # Concurrent lookups of the same place share one request
+        pending = self._in_flight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._lookup(key, location))
+            self._in_flight[key] = pending
+            pending.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, key, location):
+        params = {
+            "q": location,
+            "format": "json",
+            "limit": 1
+        }
+        # Transient failures are not cached so the next call tries again
+        try:
+            response = await self._get_client().get(self.api_url, params=params)
+        except httpx.HTTPError as e:
+            raise GeocoderUnavailable(f"geocoder request failed: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise GeocoderUnavailable(f"geocoder returned {response.status_code}")
+        if response.is_error:
+            logging.error(f"Geocoder rejected location {location!r}: HTTP {response.status_code}")
+            return None
+        try:
+            results = response.json()
+        except ValueError as e:
+            raise GeocoderUnavailable(f"invalid geocoder response: {e}") from e
+
+        if not results:
+            logging.warning(f"No coordinates found for location: {location}")
+            self.cache.set(key, NOT_FOUND, ttl_seconds=self.negative_ttl_seconds)
+            return None
+        coords = (float(results[0]["lat"]), float(results[0]["lon"]))
+        self.cache.set(key, coords)
+        return coords
 
     async def enrich_with_coordinates(self, emergency_data):
         location = emergency_data.get("location")
@@ -14,23 +108,19 @@ class GeoLocationService:
             logging.warning("No location found in emergency data.")
             return emergency_data
 
-        try:
-            params = {
-                "q": location,
-                "format": "json",
-                "limit": 1
-            }
-            response = requests.get(self.api_url, params=params, headers={"User-Agent": "AlertAI"})
-            response.raise_for_status()
-            results = response.json()
+        # GeocoderUnavailable propagates; "not found" just leaves the record as is
+        coords = await self.geocode(location)
+        if coords:
+            emergency_data["latitude"], emergency_data["longitude"] = coords
+        return emergency_data
 
-            if results:
-                coords = results[0]
-                emergency_data["latitude"] = float(coords["lat"])
-                emergency_data["longitude"] = float(coords["lon"])
-            else:
-                logging.warning(f"No coordinates found for location: {location}")
-        except Exception as e:
-            logging.error(f"Error fetching coordinates: {e}")
 
-        return emergency_data
+geolocation_service = GeoLocationService(
+    api_url=settings.geocoder_url,
+    timeout=settings.geocoder_timeout_seconds,
+    max_connections=settings.geocoder_max_connections,
+    cache_max_entries=settings.geocoder_cache_max_entries,
+    cache_ttl_seconds=settings.geocoder_cache_ttl_seconds,
+    negative_ttl_seconds=settings.geocoder_negative_ttl_seconds,
+    gazetteer=Gazetteer(settings.gazetteer_path) if settings.gazetteer_path and os.path.exists(settings.gazetteer_path) else None,
+)
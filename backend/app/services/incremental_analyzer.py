@@ -0,0 +1,98 @@
+# backend/app/services/incremental_analyzer.py
+
+from app.services.openai_service import openai_service
+from app.services.llm_scheduler import PRIORITY_ORDER, llm_scheduler
+import asyncio
+import logging
+import time
+
+
+class IncrementalAnalyzer:
+    """Keeps a running LLM analysis of a call while the caller is still talking.
+
+    The first pass analyzes everything transcribed so far; later passes only
+    send the previous result plus the text spoken since, so hang-up leaves at
+    most one small delta to process. At most one request is in flight per call.
+    A pass starts once there is new text and either ``min_interval`` seconds
+    have passed since the last one or ``min_new_chars`` characters are waiting.
+    """
+
+    def __init__(self, session, on_result=None, on_field=None, min_interval=5.0, min_new_chars=200):
+        self.session = session
+        self.on_result = on_result
+        self.on_field = on_field
+        self.min_interval = min_interval
+        self.min_new_chars = min_new_chars
+        self.analysis = None
+        self.analyzed_parts = 0
+        self._last_started = None
+        self._task = None
+        self._finalizing = False
+
+    def pending_text(self):
+        return " ".join(self.session.transcript_parts[self.analyzed_parts:])
+
+    def notify(self):
+        """Call after each new utterance; starts a pass if one is due."""
+        if self._finalizing or (self._task is not None and not self._task.done()):
+            return
+        new_chars = len(self.pending_text())
+        if not new_chars:
+            return
+        elapsed = None if self._last_started is None else time.monotonic() - self._last_started
+        if elapsed is not None and elapsed < self.min_interval and new_chars < self.min_new_chars:
+            return
+        # Interim passes are optional; while requests are queued they would only
+        # delay other calls' final analyses. The text is folded in later anyway.
+        if llm_scheduler.backlogged():
+            return
+        self._task = asyncio.create_task(self._run(final=False))
+
+    async def finalize(self):
+        """Wait for any pass in flight, fold in the remaining text and return the result."""
+        self._finalizing = True
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.analysis is None or self.pending_text():
+            await self._run(final=True)
+        return self.analysis
+
+    def priority(self):
+        """Highest priority seen so far from pre-triage or an earlier pass."""
+        candidates = [self.analysis.get("priority") if self.analysis else None]
+        if self.session.pretriage is not None:
+            candidates.append(self.session.pretriage.priority)
+        return min((p for p in candidates if p in PRIORITY_ORDER), key=PRIORITY_ORDER.get, default=None)
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _run(self, final):
+        self._last_started = time.monotonic()
+        upto = len(self.session.transcript_parts)
+        if self.analysis is None:
+            transcript = " ".join(self.session.transcript_parts[:upto])
+            result = await openai_service.analyze_emergency(
+                transcript, on_field=self.on_field, priority=self.priority(), interim=not final
+            )
+        else:
+            delta = " ".join(self.session.transcript_parts[self.analyzed_parts:upto])
+            result = await openai_service.update_analysis(
+                self.analysis, delta, on_field=self.on_field, priority=self.priority(), interim=not final
+            )
+        if not result:
+            return
+        self.analysis = result
+        self.analyzed_parts = upto
+        if self.on_result is not None:
+            try:
+                await self.on_result(result, final)
+            except Exception as e:
+                logging.warning(f"Error publishing analysis for call {self.session.call_id}: {str(e)}")
+        if not final:
+            # Text may have arrived while this pass was waiting on the model
+            asyncio.get_running_loop().call_soon(self.notify)
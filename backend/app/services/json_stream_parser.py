@@ -0,0 +1,84 @@
+# backend/app/services/json_stream_parser.py
+
+import json
+
+
+class JsonFieldStream:
+    """Incremental parser for a streamed JSON object.
+
+    ``feed`` takes the next chunk of text and returns the ``(key, value)`` pairs
+    of top-level members that became complete in it, so callers can act on
+    early fields while the rest of the object is still being generated.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expecting = None
+        self._token_start = None
+        self._key = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting == "key_string":
+                        self._key = json.loads(text[self._token_start:i + 1])
+                        self._expecting = "colon"
+                    elif self._depth == 1 and self._expecting == "value_string":
+                        completed.append(self._complete(json.loads(text[self._token_start:i + 1])))
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expecting in ("key", "value"):
+                    self._token_start = i
+                    self._expecting = self._expecting + "_string"
+            elif char in "{[":
+                if self._depth == 0:
+                    self._expecting = "key"
+                elif self._depth == 1 and self._expecting == "value":
+                    self._token_start = i
+                    self._expecting = "value_nested"
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1 and self._expecting == "value_literal":
+                    completed.append(self._complete(json.loads(text[self._token_start:i])))
+                self._depth -= 1
+                if self._depth == 1 and self._expecting == "value_nested":
+                    completed.append(self._complete(json.loads(text[self._token_start:i + 1])))
+                elif self._depth == 0:
+                    self.done = True
+            elif self._depth != 1 or char.isspace():
+                continue
+            elif char == ":" and self._expecting == "colon":
+                self._expecting = "value"
+            elif char == ",":
+                if self._expecting == "value_literal":
+                    completed.append(self._complete(json.loads(text[self._token_start:i])))
+                self._expecting = "key"
+            elif self._expecting == "value":
+                # true/false/null or a number
+                self._token_start = i
+                self._expecting = "value_literal"
+        self._pos = len(text)
+        return completed
+
+    def _complete(self, value):
+        self.fields[self._key] = value
+        self._expecting = "comma"
+        return self._key, value
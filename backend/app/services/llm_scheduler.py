@@ -0,0 +1,210 @@
+# backend/app/services/llm_scheduler.py
+
+from app.core.config import settings
+import openai
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+
+PRIORITY_ORDER = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """Caps the request start rate at ``rate`` per second with bursts of ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit: grows by about one per window of successes, halves on 429s,
+    and backs off gently when responses get slower than ``target_latency``.
+
+    Like TCP, it halves at most once per window: a 429 for a request that was
+    already in flight at the last decrease is part of the same burst and is
+    not counted again.
+    """
+
+    def __init__(self, initial, minimum, maximum, target_latency):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self._last_decrease = float("-inf")
+
+    def on_success(self, latency):
+        if latency > self.target_latency:
+            self.limit = max(self.minimum, self.limit * 0.9)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_overload(self, started):
+        """Record a 429 for a request that was started at ``started`` (time.monotonic())."""
+        if started < self._last_decrease:
+            return
+        self.limit = max(self.minimum, self.limit / 2)
+        self._last_decrease = time.monotonic()
+
+    @property
+    def slots(self):
+        return int(self.limit)
+
+
+class _Job:
+    __slots__ = ("factory", "future", "priority", "attempt", "task")
+
+    def __init__(self, factory, future, priority):
+        self.factory = factory
+        self.future = future
+        self.priority = priority
+        self.attempt = 0
+        self.task = None
+        # A caller that gives up (e.g. IncrementalAnalyzer.cancel) stops the
+        # request too, instead of leaving it to stream into a finished call
+        future.add_done_callback(self._on_future_done)
+
+    def _on_future_done(self, future):
+        if future.cancelled() and self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+class LLMScheduler:
+    """Shared gate for outbound LLM requests.
+
+    Jobs wait in a priority queue (HIGH pre-triage first, FIFO within a level;
+    interim passes of calls still in progress queue behind final analyses of
+    the same level),
+    start no faster than the token bucket allows and no more than the adaptive
+    limit at a time. Rate limits, timeouts and 5xx responses are retried with
+    full-jitter exponential backoff instead of failing the analysis.
+    """
+
+    def __init__(self, requests_per_minute=500, burst=20, initial_concurrency=8, min_concurrency=1,
+                 max_concurrency=32, target_latency=15.0, max_retries=4, backoff_base=0.5, backoff_max=20.0):
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency, target_latency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._tasks = set()
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def submit(self, factory, priority=None, interim=False):
+        """Run ``factory()`` (a coroutine function) under the scheduler and return its result."""
+        rank = (PRIORITY_ORDER.get(priority, 2), 1 if interim else 0)
+        job = _Job(factory, asyncio.get_running_loop().create_future(), rank)
+        self._enqueue(job)
+        return await job.future
+
+    def backlogged(self):
+        """True while requests are waiting for a slot; optional work should hold off."""
+        return bool(self._queue)
+
+    def stats(self):
+        return {
+            "queued": len(self._queue),
+            "in_flight": self._in_flight,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+    def _enqueue(self, job):
+        heapq.heappush(self._queue, (job.priority, next(self._sequence), job))
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queue and self._in_flight < max(1, self.concurrency.slots):
+            _, _, job = heapq.heappop(self._queue)
+            if job.future.done():  # caller went away
+                continue
+            self._in_flight += 1
+            job.task = asyncio.create_task(self._run(job))
+            self._tasks.add(job.task)
+            job.task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job):
+        retry_delay = None
+        started = time.monotonic()
+        try:
+            await self.bucket.acquire()
+            started = time.monotonic()
+            result = await job.factory()
+            self.concurrency.on_success(time.monotonic() - started)
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        except RETRYABLE_ERRORS as e:
+            if isinstance(e, openai.RateLimitError):
+                self.concurrency.on_overload(started)
+            job.attempt += 1
+            if job.attempt > self.max_retries:
+                self._fail(job, e)
+            else:
+                retry_delay = self._backoff(job.attempt, e)
+                self.retried += 1
+                logging.warning(f"LLM request failed ({type(e).__name__}), retry {job.attempt} "
+                                f"in {retry_delay:.2f}s; concurrency limit {self.concurrency.limit:.1f}")
+        except Exception as e:
+            self._fail(job, e)
+        finally:
+            self._in_flight -= 1
+            if retry_delay is not None:
+                asyncio.get_running_loop().call_later(retry_delay, self._enqueue, job)
+            self._dispatch()
+
+    def _fail(self, job, error):
+        self.failed += 1
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            delay = max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.llm_requests_per_minute,
+    burst=settings.llm_burst,
+    initial_concurrency=settings.llm_initial_concurrency,
+    min_concurrency=settings.llm_min_concurrency,
+    max_concurrency=settings.llm_max_concurrency,
+    target_latency=settings.llm_target_latency_seconds,
+    max_retries=settings.llm_max_retries,
+)
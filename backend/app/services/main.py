@@ -27,8 +27,8 @@
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import logging
-import os
 
 # Import routers and handlers with full package path
 from app.api.endpoints.twilio_webhook import router as twilio_router
@@ -36,14 +36,45 @@ from app.services.assignment_api import router as assignment_router
 from app.services.emergencies_api import router as emergencies_router
 from app.services.units_api import router as units_router
 from app.services.emergency_handler import emergency_handler
+from app.services.azure_speech_service import azure_speech_service
+from app.services.transcript_writer import transcript_writer
+from app.services.analysis_cache import analysis_cache
+from app.services.llm_scheduler import llm_scheduler
+from app.services.geolocation_service import geolocation_service
+from app.services.post_call_pipeline import post_call_pipeline
+from app.services.mongodb_service import mongodb_service
+from app.core.database import database
+from app.services.change_feed import backfill_updated_at
+from app.services.event_hub import event_hub
+from app.services.units_service import units_service
+from app.core.indexes import ensure_indexes, index_report
+from app.core.config import settings
 
 # Set up logging
 # logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Ensure the transcripts directory exists
-os.makedirs("transcripts", exist_ok=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-warm speech recognizers so the first calls do not pay for setup
+    await azure_speech_service.start()
+    transcript_writer.start()
+    if settings.mongodb_ensure_indexes:
+        await ensure_indexes()
+    await mongodb_service.backfill_sort_fields()
+    await backfill_updated_at(database.emergencies, "time")
+    await backfill_updated_at(database.units, "last_updated")
+    await units_service.normalize_statuses()
+    units_service.start()
+    await post_call_pipeline.start()
+    yield
+    await post_call_pipeline.stop()
+    await units_service.stop()
+    await transcript_writer.stop()
+    await geolocation_service.close()
+    await azure_speech_service.shutdown()
+    database.close()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -73,6 +104,24 @@ async def websocket_endpoint(websocket: WebSocket):
     finally:
         logging.info("WebSocket connection closed")
 
+@app.websocket("/ws/dashboard")
+async def dashboard_feed(websocket: WebSocket):
+    """Push emergency and unit changes to dispatcher consoles as they happen."""
+    await websocket.accept()
+    subscription = event_hub.subscribe()
+    try:
+        await websocket.send_json({"type": "hello"})
+        while True:
+            message = await subscription.get(timeout=settings.dashboard_heartbeat_seconds)
+            # Heartbeats keep proxies from closing idle sockets and surface dead clients
+            await websocket.send_text(message if message is not None else '{"type": "ping"}')
+    except WebSocketDisconnect:
+        logging.info("Dashboard subscriber disconnected")
+    except Exception as e:
+        logging.error(f"Error in dashboard feed: {str(e)}")
+    finally:
+        event_hub.unsubscribe(subscription)
+
 @app.get("/api/analysis/{call_id}")
 async def get_analysis(call_id: str):
     result = await emergency_handler.get_analysis_result(call_id)
@@ -80,6 +129,26 @@ async def get_analysis(call_id: str):
         return result
     raise HTTPException(status_code=404, detail="Analysis not found")
 
+@app.get("/api/analysis_cache/stats")
+async def get_analysis_cache_stats():
+    return analysis_cache.stats()
+
+@app.get("/api/llm_scheduler/stats")
+async def get_llm_scheduler_stats():
+    return llm_scheduler.stats()
+
+@app.get("/api/post_call/stats")
+async def get_post_call_stats():
+    return post_call_pipeline.stats()
+
+@app.get("/api/dashboard_feed/stats")
+async def get_dashboard_feed_stats():
+    return event_hub.stats()
+
+@app.get("/api/db/indexes")
+async def get_db_indexes():
+    return await index_report()
+
 @app.get("/")
 async def root():
     return {"message": "Emergency Response System API"}
@@ -1,42 +1,163 @@
 # backend/app/services/mongodb_service.py
 
-from pymongo import MongoClient
-from app.core.config import settings
+from pymongo import ReturnDocument
+from app.core.database import database
+from app.services.llm_scheduler import PRIORITY_ORDER
+from app.services.event_hub import event_hub
 import logging
-import asyncio
 from datetime import datetime
 
+# Fields the dashboard table and map need; transcripts and the long analysis
+# text are fetched per call through /emergencies/by_call_id
+LIST_FIELDS = {
+    "call_id": 1, "emergency_type": 1, "priority": 1, "caller_name": 1, "status": 1,
+    "location": 1, "latitude": 1, "longitude": 1, "time": 1, "assigned_unit": 1,
+    "unassigned": 1, "priority_rank": 1,
+    # Lets clients drop a copy older than the one they already hold
+    "updated_at": 1,
+}
+
+
+def priority_rank(priority):
+    """Sort key stored alongside ``priority`` so Mongo can order HIGH first."""
+    return PRIORITY_ORDER.get(priority, 2)
+
+
+def serialize_emergency(doc, full=True):
+    # Cursor documents are fresh dicts, so they are mapped in place
+    doc['id'] = str(doc.pop('_id', ''))
+    # Map Mongo fields to frontend keys
+    doc.setdefault('call_id', '')
+    doc.setdefault('emergency_type', '')
+    doc.setdefault('priority', 'LOW')
+    doc.setdefault('caller_name', '')
+    doc.setdefault('status', 'OPEN')
+    doc.setdefault('location', '')
+    doc.setdefault('latitude', '')
+    doc.setdefault('longitude', '')
+    if full:
+        doc.setdefault('transcript', '')
+        doc['ai_recommendation'] = doc.get('ai_recommendation', doc.get('recommended_actions', ''))
+    # Add any other field mapping if needed
+    return doc
+
+
+def publish_emergency(doc, created=False):
+    """Push the list view of an emergency to /ws/dashboard subscribers."""
+    if doc:
+        event_hub.publish("emergency.created" if created else "emergency.updated",
+                          serialize_emergency(doc, full=False))
+
+
 class MongoDBService:
-    def __init__(self):
-        self.client = MongoClient(settings.mongodb_url)
-        self.db = self.client[settings.mongodb_db_name]
-        self.collection = self.db[settings.mongodb_collection_name]
+    @property
+    def collection(self):
+        return database.emergencies
 
     async def insert_emergency_data(self, emergency_data, transcript, call_id):
         try:
             document = {
-                "call_id": call_id,
                 "emergency_type": emergency_data.get("emergency_type"),
                 "priority": emergency_data.get("priority"),
+                "priority_rank": priority_rank(emergency_data.get("priority")),
                 "location": emergency_data.get("location"),
                 "caller_name": emergency_data.get("caller_name"),
                 "critical_info": emergency_data.get("critical_info"),
                 "priority_explanation": emergency_data.get("priority_explanation"),
                 "recommended_actions": emergency_data.get("recommended_actions"),
                 "transcript": transcript,
-                "time": datetime.utcnow(),
-                "latitude": emergency_data.get("latitude"),
-                "longitude": emergency_data.get("longitude"),
-                "status": "unassigned"
+                "pretriage": emergency_data.get("pretriage"),
+                "analysis_status": emergency_data.get("analysis_status", "complete"),
+                "updated_at": datetime.utcnow(),
             }
-            # Use run_in_executor to run the synchronous insert operation asynchronously
-            result = await asyncio.get_event_loop().run_in_executor(
-                None, self.collection.insert_one, document
+            if document["analysis_status"] == "failed":
+                # Don't blank out what a provisional record already shows
+                document = {key: value for key, value in document.items() if value is not None}
+                if "priority" not in document:
+                    del document["priority_rank"]
+            # Coordinates are usually patched in later by the post-call pipeline;
+            # never blank out ones that are already there
+            if emergency_data.get("latitude") is not None:
+                document["latitude"] = emergency_data.get("latitude")
+                document["longitude"] = emergency_data.get("longitude")
+            # Upsert on call_id: a provisional record from pre-triage may already
+            # exist, and a dispatcher may have assigned it, so status and time are
+            # only written when the document is new.
+            update = await self.collection.update_one(
+                {"call_id": call_id},
+                {"$set": document,
+                 "$setOnInsert": {"time": datetime.utcnow(), "status": "unassigned", "unassigned": True}},
+                upsert=True,
             )
-            logging.info(f"Emergency data inserted with ID: {result.inserted_id}")
-            return result.inserted_id
+            result = await self.collection.find_one({"call_id": call_id}, LIST_FIELDS)
+            logging.info(f"Emergency data inserted with ID: {result['_id']}")
+            mongo_id = result["_id"]
+            publish_emergency(result, created=update.upserted_id is not None)
+            return mongo_id
         except Exception as e:
             logging.error(f"Error inserting emergency data into MongoDB: {str(e)}")
             return None
 
+    async def patch_emergency(self, call_id, fields):
+        try:
+            result = await self.collection.find_one_and_update(
+                {"call_id": call_id}, {"$set": {**fields, "updated_at": datetime.utcnow()}},
+                projection=LIST_FIELDS, return_document=ReturnDocument.AFTER,
+            )
+            publish_emergency(result)
+            return result is not None
+        except Exception as e:
+            logging.error(f"Error updating emergency {call_id} in MongoDB: {str(e)}")
+            return False
+
+    async def insert_provisional_emergency(self, estimate, transcript, call_id):
+        """Put a pre-triaged call on the dashboard before the LLM analysis exists.
+
+        Only ever inserts; if the record is already there nothing is changed.
+        """
+        try:
+            document = {
+                "call_id": call_id,
+                "emergency_type": estimate.get("emergency_type"),
+                "priority": estimate.get("priority"),
+                "priority_rank": priority_rank(estimate.get("priority")),
+                "transcript": transcript,
+                "time": datetime.utcnow(),
+                "status": "unassigned",
+                "unassigned": True,
+                "analysis_status": "pending",
+                "updated_at": datetime.utcnow(),
+            }
+            if estimate.get("source") == "pretriage":
+                document["pretriage"] = estimate
+                document["critical_info"] = f"Pre-triage keywords: {', '.join(estimate.get('matched_keywords', []))}"
+            result = await self.collection.update_one({"call_id": call_id}, {"$setOnInsert": document}, upsert=True)
+            if result.upserted_id is not None:
+                view = {key: value for key, value in document.items() if key in LIST_FIELDS}
+                publish_emergency({**view, "_id": result.upserted_id}, created=True)
+            logging.info(f"Provisional emergency record created for call {call_id}")
+            return True
+        except Exception as e:
+            logging.error(f"Error inserting provisional emergency into MongoDB: {str(e)}")
+            return False
+
+    async def backfill_sort_fields(self):
+        """Derive priority_rank/unassigned for records written before they existed."""
+        try:
+            result = await self.collection.update_many(
+                {"$or": [{"priority_rank": {"$exists": False}}, {"unassigned": {"$exists": False}}]},
+                [{"$set": {
+                    "priority_rank": {"$switch": {
+                        "branches": [{"case": {"$eq": ["$priority", p]}, "then": rank}
+                                     for p, rank in PRIORITY_ORDER.items()],
+                        "default": priority_rank(None),
+                    }},
+                    "unassigned": {"$eq": [{"$toLower": {"$ifNull": ["$status", "unassigned"]}}, "unassigned"]},
+                }}],
+            )
+            if result.modified_count:
+                logging.info(f"Backfilled sort fields on {result.modified_count} emergency record(s)")
+        except Exception as e:
+            logging.error(f"Error backfilling emergency sort fields: {str(e)}")
+
 mongodb_service = MongoDBService()
\ No newline at end of file
@@ -1,24 +1,53 @@
 # backend/app/services/openai_service.py
 
 from openai import AsyncOpenAI
+from pydantic import ValidationError
 from app.core.config import settings
+from app.services.analysis_schema import EmergencyAnalysis, EMERGENCY_ANALYSIS_RESPONSE_FORMAT
+from app.services.json_stream_parser import JsonFieldStream
+from app.services.analysis_cache import analysis_cache, normalize_transcript
+from app.services.llm_scheduler import llm_scheduler
 import logging
 import json
 
+RESPONSE_FORMAT = """
+            Format the response as JSON:
+            {
+                "priority": "LOW/MEDIUM/HIGH",
+                "emergency_type": "",
+                "location": "",
+                "caller_name": "",
+                "critical_info": "",
+                "priority_explanation": "",
+                "recommended_actions": ""
+            }
+"""
+
+async def _emit(on_field, key, value):
+    # A failing callback (e.g. a closed websocket) must not cost us the analysis
+    try:
+        await on_field(key, value)
+    except Exception as e:
+        logging.warning(f"on_field callback failed for {key}: {str(e)}")
+
 class OpenAIService:
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Retries are handled by llm_scheduler so it can see rate limits and back off
+        self.client = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
 
-    async def analyze_emergency(self, transcript_file):
-        try:
-            with open(transcript_file, 'r') as file:
-                transcript = file.read()
+    async def analyze_emergency(self, transcript, on_field=None, priority=None, interim=False):
+        """Analyze a transcript.
 
-            prompt = f"""
+        ``on_field(key, value)`` is awaited for each field as soon as it has been
+        streamed, before the rest of the completion arrives. ``priority`` is the
+        best current estimate for the call and orders the request in llm_scheduler;
+        ``interim`` passes queue behind final analyses of the same priority.
+        """
+        prompt = f"""
             Analyze the following emergency call transcript and extract key information.
             Provide the following details:
-            1. Emergency type
-            2. Priority level (LOW, MEDIUM, HIGH)
+            1. Priority level (LOW, MEDIUM, HIGH)
+            2. Emergency type
             3. Location (if mentioned)
             4. Caller's name (if mentioned)
             5. Any other critical information (Summarize this into bullets)
@@ -28,37 +57,81 @@ class OpenAIService:
             Also, provide recommended actions that can be taken provided the information.
 
             Transcript: {transcript}
+            {RESPONSE_FORMAT}
+            """
+        cache_key = analysis_cache.key("analyze_emergency", normalize_transcript(transcript))
+        return await self._complete(prompt, "analyze_emergency", cache_key, on_field, priority, interim)
 
-            Format the response as JSON:
-            {{
-                "emergency_type": "",
-                "priority": "LOW/MEDIUM/HIGH",
-                "location": "",
-                "caller_name": "",
-                "critical_info": "",
-                "priority_explanation": ""
-                "recommended_actions": ""
-            }}
+    async def update_analysis(self, previous_analysis, new_transcript, on_field=None, priority=None, interim=False):
+        """Extend an analysis of a call still in progress with transcript text spoken since."""
+        prompt = f"""
+            You previously analyzed the start of an ongoing emergency call:
+            {json.dumps(previous_analysis)}
+
+            The caller has since said: {new_transcript}
+
+            Update the analysis with the new information. Keep earlier details that are
+            still accurate, correct anything the new text contradicts, and raise or lower
+            the priority level (LOW, MEDIUM, HIGH) if the situation has changed.
+            {RESPONSE_FORMAT}
             """
+        cache_key = analysis_cache.key(
+            "update_analysis", json.dumps(previous_analysis, sort_keys=True), normalize_transcript(new_transcript)
+        )
+        return await self._complete(prompt, "update_analysis", cache_key, on_field, priority, interim)
+
+    async def _complete(self, prompt, operation, cache_key, on_field=None, priority=None, interim=False):
+        cached = await analysis_cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"Analysis cache hit in {operation}")
+            if on_field is not None:
+                for key, value in cached.items():
+                    await _emit(on_field, key, value)
+            return cached
+
+        content = None
+        finish_reason = None
+        for attempt in range(1, settings.openai_max_attempts + 1):
+            try:
+                content, finish_reason = await llm_scheduler.submit(
+                    lambda: self._stream_completion(prompt, on_field), priority, interim
+                )
+                analysis = EmergencyAnalysis.model_validate_json(content).model_dump()
+                await analysis_cache.set(cache_key, analysis)
+                return analysis
+            except ValidationError as e:
+                logging.error(f"Invalid analysis from OpenAI in {operation} "
+                              f"(attempt {attempt}, finish_reason={finish_reason}): {e}")
+                logging.error(f"Raw response content: {content}")
+            except Exception as e:
+                logging.error(f"Error in {operation}: {str(e)}")
+                return None
+        return None
 
-            response = await self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an emergency response AI assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=300
-            )
-            content = response.choices[0].message.content
-            # logging.debug(f"OpenAI response: {content}")
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            logging.error(f"Error decoding JSON from OpenAI response: {e}")
-            logging.error(f"Raw response content: {content}")
-            return None
-        except Exception as e:
-            logging.error(f"Error in analyze_emergency: {str(e)}")
-            return None
+    async def _stream_completion(self, prompt, on_field):
+        stream = await self.client.chat.completions.create(
+            model=settings.openai_model,
+            messages=[
+                {"role": "system", "content": "You are an emergency response AI assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=settings.openai_max_tokens,
+            response_format=EMERGENCY_ANALYSIS_RESPONSE_FORMAT,
+            stream=True,
+        )
+        parser = JsonFieldStream()
+        finish_reason = None
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            if not choice.delta.content:
+                continue
+            for key, value in parser.feed(choice.delta.content):
+                if on_field is not None:
+                    await _emit(on_field, key, value)
+        return parser.text, finish_reason
 
-openai_service = OpenAIService()
\ No newline at end of file
+openai_service = OpenAIService()
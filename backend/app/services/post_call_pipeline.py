@@ -0,0 +1,156 @@
+# backend/app/services/post_call_pipeline.py
+
+from app.core.config import settings
+from app.core.database import database
+from app.services.mongodb_service import mongodb_service
+from app.services.geolocation_service import geolocation_service
+from app.services.openai_service import openai_service
+from app.services.llm_scheduler import PRIORITY_ORDER
+from datetime import datetime
+import asyncio
+import itertools
+import logging
+import random
+
+# A job moves through these stages in order; each one is persisted before it runs.
+# "analyze" only runs for calls whose analysis failed during the call.
+STAGES = ("insert", "analyze", "enrich")
+
+
+class PostCallPipeline:
+    """Persists and enriches analyzed calls outside the websocket coroutine.
+
+    Every finished call becomes a job stored in Mongo, so a restart or a
+    dropped websocket cannot lose it. A bounded pool of workers takes jobs
+    HIGH priority first: the emergency record is inserted as soon as its
+    analysis is available, then geocoded and patched in a second stage so a
+    slow geocoder never delays the record showing up on the dashboard.
+    """
+
+    def __init__(self, workers=4, max_attempts=5):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._tasks = []
+
+    @property
+    def jobs(self):
+        return database.collection(settings.post_call_jobs_collection)
+
+    async def start(self):
+        try:
+            async for job in self.jobs.find({"status": "pending"}):
+                self._enqueue(job)
+        except Exception as e:
+            logging.error(f"Error loading pending post-call jobs: {str(e)}")
+        if self._queue.qsize():
+            logging.info(f"Resuming {self._queue.qsize()} post-call job(s)")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, call_id, analysis, transcript, priority=None):
+        job = {
+            "_id": call_id,
+            "call_id": call_id,
+            "stage": STAGES[0],
+            "priority": priority,
+            "analysis": analysis,
+            "transcript": transcript,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            await self.jobs.replace_one({"_id": call_id}, job, upsert=True)
+        except Exception as e:
+            # Still process it; it just will not survive a restart
+            logging.error(f"Error persisting post-call job for call {call_id}: {str(e)}")
+        self._enqueue(job)
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "workers": len(self._tasks)}
+
+    def _enqueue(self, job):
+        self._queue.put_nowait((PRIORITY_ORDER.get(job.get("priority"), 2), next(self._sequence), job))
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._run_stage(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._retry(job, e)
+            finally:
+                self._queue.task_done()
+
+    async def _run_stage(self, job):
+        call_id = job["call_id"]
+        if job["stage"] == "insert":
+            mongo_id = await mongodb_service.insert_emergency_data(job["analysis"], job["transcript"], call_id)
+            if not mongo_id:
+                raise RuntimeError("insert failed")
+            failed = job["analysis"].get("analysis_status") == "failed"
+            await self._advance(job, "analyze" if failed else "enrich")
+        elif job["stage"] == "analyze":
+            # Raising leaves the job to _retry's backoff until the LLM recovers
+            analysis = await openai_service.analyze_emergency(job["transcript"], priority=job.get("priority"))
+            if not analysis:
+                raise RuntimeError("analysis still unavailable")
+            analysis = {**analysis, "pretriage": job["analysis"].get("pretriage")}
+            if not await mongodb_service.insert_emergency_data(analysis, job["transcript"], call_id):
+                raise RuntimeError("insert failed")
+            job["analysis"] = analysis
+            job["priority"] = analysis.get("priority")
+            await self._advance(job, "enrich", {"analysis": analysis, "priority": job["priority"]})
+        elif job["stage"] == "enrich":
+            # A geocoder outage raises GeocoderUnavailable and the stage is retried;
+            # only a location the geocoder doesn't know finishes without coordinates
+            analysis = await geolocation_service.enrich_with_coordinates(dict(job["analysis"]))
+            if analysis.get("latitude") is not None:
+                patched = await mongodb_service.patch_emergency(
+                    call_id, {"latitude": analysis["latitude"], "longitude": analysis["longitude"]}
+                )
+                if not patched:
+                    raise RuntimeError("patch failed")
+            await self.jobs.delete_one({"_id": call_id})
+            logging.info(f"Post-call processing complete for call {call_id}")
+
+    async def _advance(self, job, stage, fields=None):
+        job["stage"] = stage
+        job["attempts"] = 0
+        try:
+            await self.jobs.update_one({"_id": job["_id"]}, {"$set": {**(fields or {}), "stage": stage, "attempts": 0}})
+        except Exception as e:
+            logging.error(f"Error persisting post-call job for call {job['call_id']}: {str(e)}")
+        self._enqueue(job)
+
+    async def _retry(self, job, error):
+        job["attempts"] += 1
+        failed = job["attempts"] >= self.max_attempts
+        logging.error(f"Post-call {job['stage']} failed for call {job['call_id']} "
+                      f"(attempt {job['attempts']}): {str(error)}")
+        try:
+            await self.jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"attempts": job["attempts"], "status": "failed" if failed else "pending",
+                          "last_error": str(error)}},
+            )
+        except Exception as e:
+            logging.error(f"Error persisting post-call job for call {job['call_id']}: {str(e)}")
+        if not failed:
+            delay = random.uniform(0, min(60.0, 2 ** job["attempts"]))
+            asyncio.get_running_loop().call_later(delay, self._enqueue, job)
+
+
+post_call_pipeline = PostCallPipeline(
+    workers=settings.post_call_workers,
+    max_attempts=settings.post_call_max_attempts,
+)
@@ -0,0 +1,183 @@
+# backend/app/services/pretriage.py
+
+from app.core.config import settings
+from collections import deque
+import json
+import logging
+
+# Weight of a keyword hit when scoring emergency types; higher is more severe.
+# Not a sort rank: for ordering, HIGH first, see llm_scheduler.PRIORITY_ORDER.
+SEVERITY = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
+# keyword -> (emergency_type, priority). Multi-word phrases are matched as a unit.
+DEFAULT_LEXICON = {
+    "not breathing": ("medical", "HIGH"),
+    "stopped breathing": ("medical", "HIGH"),
+    "can't breathe": ("medical", "HIGH"),
+    "unconscious": ("medical", "HIGH"),
+    "unresponsive": ("medical", "HIGH"),
+    "heart attack": ("medical", "HIGH"),
+    "cardiac arrest": ("medical", "HIGH"),
+    "chest pain": ("medical", "HIGH"),
+    "stroke": ("medical", "HIGH"),
+    "seizure": ("medical", "HIGH"),
+    "choking": ("medical", "HIGH"),
+    "overdose": ("medical", "HIGH"),
+    "bleeding": ("medical", "MEDIUM"),
+    "blood": ("medical", "MEDIUM"),
+    "broken": ("medical", "MEDIUM"),
+    "fell": ("medical", "MEDIUM"),
+    "pregnant": ("medical", "MEDIUM"),
+    "fire": ("fire", "HIGH"),
+    "smoke": ("fire", "HIGH"),
+    "burning": ("fire", "HIGH"),
+    "explosion": ("fire", "HIGH"),
+    "gas leak": ("fire", "HIGH"),
+    "gun": ("crime", "HIGH"),
+    "shot": ("crime", "HIGH"),
+    "shooting": ("crime", "HIGH"),
+    "stabbed": ("crime", "HIGH"),
+    "knife": ("crime", "HIGH"),
+    "intruder": ("crime", "HIGH"),
+    "break in": ("crime", "HIGH"),
+    "breaking in": ("crime", "HIGH"),
+    "kidnapped": ("crime", "HIGH"),
+    "assault": ("crime", "MEDIUM"),
+    "robbery": ("crime", "MEDIUM"),
+    "robbed": ("crime", "MEDIUM"),
+    "stolen": ("crime", "LOW"),
+    "trapped": ("accident", "HIGH"),
+    "car accident": ("accident", "MEDIUM"),
+    "crash": ("accident", "MEDIUM"),
+    "hit by a car": ("accident", "HIGH"),
+    "noise": ("disturbance", "LOW"),
+    "lost": ("other", "LOW"),
+}
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one pass over the text finds every keyword."""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(keyword)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def search(self, text):
+        """Yield ``(start, keyword)`` for every occurrence in ``text``."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword in self._output[state]:
+                yield index - len(keyword) + 1, keyword
+
+
+class PreTriageClassifier:
+    def __init__(self, lexicon):
+        self.lexicon = {keyword.lower(): value for keyword, value in lexicon.items()}
+        self.matcher = AhoCorasick(self.lexicon)
+
+    def matches(self, text):
+        text = text.lower()
+        found = []
+        for start, keyword in self.matcher.search(text):
+            end = start + len(keyword)
+            # Whole words only, so "fire" does not fire on "fireplace"
+            if (start and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            found.append(keyword)
+        return found
+
+
+class TriageEstimate:
+    """Running keyword estimate for one call, refined as utterances arrive."""
+
+    __slots__ = ("classifier", "type_scores", "priority", "matched", "published")
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self.type_scores = {}
+        self.priority = None
+        self.matched = []
+        self.published = False
+
+    def update(self, text):
+        """Fold in one utterance; return True if the estimate changed."""
+        keywords = self.classifier.matches(text)
+        if not keywords:
+            return False
+        before = (self.emergency_type, self.priority)
+        for keyword in keywords:
+            emergency_type, priority = self.classifier.lexicon[keyword]
+            severity = SEVERITY[priority]
+            self.type_scores[emergency_type] = self.type_scores.get(emergency_type, 0) + severity
+            if self.priority is None or severity > SEVERITY[self.priority]:
+                self.priority = priority
+            if keyword not in self.matched:
+                self.matched.append(keyword)
+        return (self.emergency_type, self.priority) != before
+
+    @property
+    def emergency_type(self):
+        if not self.type_scores:
+            return None
+        return max(self.type_scores, key=self.type_scores.get)
+
+    def as_dict(self):
+        return {
+            "emergency_type": self.emergency_type,
+            "priority": self.priority,
+            "matched_keywords": list(self.matched),
+            "source": "pretriage",
+        }
+
+
+def load_lexicon(path):
+    if not path:
+        return DEFAULT_LEXICON
+    try:
+        with open(path, "r") as file:
+            entries = json.load(file)
+        lexicon = {}
+        for keyword, entry in entries.items():
+            priority = entry["priority"].upper()
+            if priority not in SEVERITY:
+                raise ValueError(f"unknown priority {priority!r} for keyword {keyword!r}")
+            lexicon[keyword] = (entry["emergency_type"], priority)
+        return lexicon
+    except Exception as e:
+        logging.error(f"Error loading pre-triage lexicon from {path}, using defaults: {str(e)}")
+        return DEFAULT_LEXICON
+
+
+pretriage_classifier = PreTriageClassifier(load_lexicon(settings.pretriage_lexicon_path))
@@ -0,0 +1,98 @@
+# backend/app/services/recognizer_pool.py
+
+import azure.cognitiveservices.speech as speechsdk
+from collections import deque
+import asyncio
+import logging
+import time
+
+
+class RecognizerSession:
+    """A push stream wired to a SpeechRecognizer whose service connection is already open."""
+
+    __slots__ = ("audio_stream", "recognizer", "connection", "created_at")
+
+    def __init__(self, audio_stream, recognizer, connection):
+        self.audio_stream = audio_stream
+        self.recognizer = recognizer
+        self.connection = connection
+        self.created_at = time.monotonic()
+
+
+class RecognizerPool:
+    """Keeps ``size`` pre-connected recognizers ready so a new call skips the
+    SDK setup and the websocket handshake to the speech service.
+
+    Recognizers are bound to their push stream, so each one serves exactly one
+    call; the pool tops itself back up in the background after every acquire.
+    """
+
+    def __init__(self, speech_config, executor, size=4, max_idle_seconds=180.0):
+        self.speech_config = speech_config
+        self.executor = executor
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = deque()
+        self._building = 0
+        self._refill_task = None
+
+    def _build(self):
+        audio_stream = speechsdk.audio.PushAudioInputStream()
+        audio_config = speechsdk.audio.AudioConfig(stream=audio_stream)
+        recognizer = speechsdk.SpeechRecognizer(speech_config=self.speech_config, audio_config=audio_config)
+        connection = speechsdk.Connection.from_recognizer(recognizer)
+        connection.open(True)
+        return RecognizerSession(audio_stream, recognizer, connection)
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        session = None
+        while self._idle:
+            candidate = self._idle.popleft()
+            if time.monotonic() - candidate.created_at < self.max_idle_seconds:
+                session = candidate
+                break
+            # The service drops idle connections; do not hand out a stale one
+            loop.run_in_executor(self.executor, self._close, candidate)
+        if session is None:
+            logging.info("Recognizer pool empty, building a recognizer on demand")
+            session = await loop.run_in_executor(self.executor, self._build)
+        self.start()
+        return session
+
+    async def release(self, session):
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._close, session)
+
+    def start(self):
+        """Schedule a background top-up of the pool if one is not already running."""
+        if self.size > 0 and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        loop = asyncio.get_running_loop()
+        while len(self._idle) + self._building < self.size:
+            self._building += 1
+            try:
+                session = await loop.run_in_executor(self.executor, self._build)
+            except Exception as e:
+                logging.error(f"Error pre-warming speech recognizer: {str(e)}")
+                return
+            finally:
+                self._building -= 1
+            self._idle.append(session)
+        logging.info(f"Recognizer pool warm with {len(self._idle)} idle recognizer(s)")
+
+    async def close(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+        loop = asyncio.get_running_loop()
+        while self._idle:
+            await loop.run_in_executor(self.executor, self._close, self._idle.popleft())
+
+    @staticmethod
+    def _close(session):
+        try:
+            session.connection.close()
+        except Exception as e:
+            logging.warning(f"Error closing speech connection: {str(e)}")
+        session.audio_stream.close()
@@ -1,24 +1,30 @@
-from pymongo import MongoClient
+# Seed the units collection using the configured MongoDB connection:
+#   python -m app.services.seed_units
+
 from datetime import datetime
-from urllib.parse import quote_plus
+import asyncio
 
-username = quote_plus("pranav0909")
-password = quote_plus("alertai")
-uri = f"mongo_db_url"
-client = MongoClient(uri)
-db = client['alertai']
+from app.core.config import settings
+from app.core.database import database
 
 initial_units = [
-    {"unit_id": "P001", "type": "police", "status": "available", "location": "Station 1", "last_updated": datetime.utcnow()},
-    {"unit_id": "P002", "type": "police", "status": "available", "location": "Station 2", "last_updated": datetime.utcnow()},
-    {"unit_id": "A001", "type": "ambulance", "status": "available", "location": "Hospital 1", "last_updated": datetime.utcnow()},
-    {"unit_id": "F001", "type": "fire_truck", "status": "available", "location": "Fire Station 1", "last_updated": datetime.utcnow()},
+    {"unit_id": "P001", "type": "police", "status": "available", "location": "Station 1", "last_updated": datetime.utcnow(), "updated_at": datetime.utcnow()},
+    {"unit_id": "P002", "type": "police", "status": "available", "location": "Station 2", "last_updated": datetime.utcnow(), "updated_at": datetime.utcnow()},
+    {"unit_id": "A001", "type": "ambulance", "status": "available", "location": "Hospital 1", "last_updated": datetime.utcnow(), "updated_at": datetime.utcnow()},
+    {"unit_id": "F001", "type": "fire_truck", "status": "available", "location": "Fire Station 1", "last_updated": datetime.utcnow(), "updated_at": datetime.utcnow()},
 ]
 
-print("Connecting to database...")
-print("URI:", uri)
 
-result = db.units.insert_many(initial_units)
+async def main():
+    print("Connecting to database...")
+    print("Database:", settings.mongodb_db_name)
+
+    result = await database.units.insert_many(initial_units)
+
+    print("Inserted IDs:", result.inserted_ids)
+    print("Done!")
+    database.close()
+
 
-print("Inserted IDs:", result.inserted_ids)
-print("Done!")
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+# backend/app/services/spatial_grid.py
+
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialGrid:
+    """Uniform lat/lon grid of point positions, bucketed by a category (unit type).
+
+    Nearest-neighbour queries scan rings of cells outward from the query
+    point and stop once no unvisited cell can hold anything closer than the
+    candidates already found, so a query touches a handful of cells instead
+    of every unit. When the units are so sparse that the rings would visit
+    more cells than there are units, it scans that category's units directly.
+    """
+
+    def __init__(self, cell_degrees=0.05):
+        self.cell_degrees = cell_degrees
+        self._cells = {}      # (category, row, col) -> {key: (lat, lon)}
+        self._positions = {}  # key -> (category, row, col, lat, lon)
+        self._extent = {}     # category -> (min_row, max_row, min_col, max_col)
+        self._members = {}    # category -> {key: (lat, lon)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def set(self, key, category, lat, lon):
+        row, col = self._cell(lat, lon)
+        with self._lock:
+            self._discard(key)
+            self._cells.setdefault((category, row, col), {})[key] = (lat, lon)
+            self._positions[key] = (category, row, col, lat, lon)
+            self._members.setdefault(category, {})[key] = (lat, lon)
+            extent = self._extent.get(category)
+            if extent is None:
+                self._extent[category] = (row, row, col, col)
+            else:
+                self._extent[category] = (min(extent[0], row), max(extent[1], row),
+                                          min(extent[2], col), max(extent[3], col))
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        entry = self._positions.pop(key, None)
+        if entry is not None:
+            category, row, col = entry[:3]
+            self._members[category].pop(key, None)
+            cell = self._cells.get((category, row, col))
+            if cell is not None:
+                cell.pop(key, None)
+                if not cell:
+                    del self._cells[(category, row, col)]
+
+    def nearest(self, category, lat, lon, limit):
+        """Up to ``limit`` (distance_km, key) pairs of ``category``, closest first."""
+        with self._lock:
+            extent = self._extent.get(category)
+            if extent is None:
+                return []
+            row0, col0 = self._cell(lat, lon)
+            # Smallest km width of one cell around the query point; bounds how
+            # close anything in ring r + 1 or beyond can be
+            cell_km = self.cell_degrees * KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat), 89.0))), 0.01)
+            max_ring = max(abs(row0 - extent[0]), abs(row0 - extent[1]),
+                           abs(col0 - extent[2]), abs(col0 - extent[3]))
+            found = []
+            visited = 0
+            for ring in range(max_ring + 1):
+                visited += 8 * ring or 1
+                if visited > len(self._members[category]):
+                    found = [(haversine_km(lat, lon, p_lat, p_lon), key)
+                             for key, (p_lat, p_lon) in self._members[category].items()]
+                    break
+                for row in range(row0 - ring, row0 + ring + 1):
+                    edge = abs(row - row0) == ring
+                    for col in (range(col0 - ring, col0 + ring + 1) if edge else (col0 - ring, col0 + ring)):
+                        for key, (p_lat, p_lon) in self._cells.get((category, row, col), {}).items():
+                            found.append((haversine_km(lat, lon, p_lat, p_lon), key))
+                if len(found) >= limit:
+                    found.sort()
+                    if found[limit - 1][0] <= ring * cell_km:
+                        break
+            found.sort()
+            return found[:limit]
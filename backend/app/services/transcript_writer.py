@@ -0,0 +1,126 @@
+# backend/app/services/transcript_writer.py
+
+from app.core.config import settings
+from collections import defaultdict
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import os
+import shutil
+import time
+
+
+class TranscriptWriter:
+    """Background writer that persists call transcripts in batches.
+
+    Utterances are buffered in memory and appended to disk from a worker thread
+    every ``flush_interval`` seconds, or sooner once ``max_pending`` utterances
+    are waiting. Files are sharded as ``<root>/YYYY/MM/DD/transcript_<call_id>.txt``
+    and day directories older than ``retention_days`` are removed.
+    """
+
+    def __init__(self, root="transcripts", flush_interval=2.0, max_pending=200,
+                 retention_days=30, rotate_interval=3600.0):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retention_days = retention_days
+        self.rotate_interval = rotate_interval
+        self._pending = defaultdict(list)
+        self._pending_count = 0
+        self._wake = None
+        self._task = None
+        self._last_rotation = None
+
+    def path_for(self, call_id):
+        try:
+            day = datetime.strptime(call_id[:8], "%Y%m%d")
+        except ValueError:
+            day = datetime.now()
+        return os.path.join(self.root, day.strftime("%Y"), day.strftime("%m"), day.strftime("%d"),
+                            f"transcript_{call_id}.txt")
+
+    def append(self, call_id, text):
+        self._pending[call_id].append(text)
+        self._pending_count += 1
+        if self._pending_count >= self.max_pending and self._wake is not None:
+            self._wake.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = defaultdict(list)
+        self._pending_count = 0
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            logging.error(f"Error flushing transcripts: {str(e)}", exc_info=True)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+            if self.retention_days and (self._last_rotation is None
+                                        or time.monotonic() - self._last_rotation >= self.rotate_interval):
+                self._last_rotation = time.monotonic()
+                try:
+                    await asyncio.to_thread(self._rotate)
+                except Exception as e:
+                    logging.error(f"Error rotating transcripts: {str(e)}", exc_info=True)
+
+    def _write_batch(self, batch):
+        for call_id, parts in batch.items():
+            path = self.path_for(call_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a") as file:
+                file.write(" ".join(parts) + " ")
+        logging.info(f"Flushed transcript text for {len(batch)} call(s)")
+
+    def _rotate(self):
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y%m%d")
+        if not os.path.isdir(self.root):
+            return
+        for year in os.listdir(self.root):
+            year_dir = os.path.join(self.root, year)
+            if not (year.isdigit() and os.path.isdir(year_dir)):
+                continue
+            for month in os.listdir(year_dir):
+                month_dir = os.path.join(year_dir, month)
+                if not os.path.isdir(month_dir):
+                    continue
+                for day in os.listdir(month_dir):
+                    if f"{year}{month}{day}" < cutoff:
+                        shutil.rmtree(os.path.join(month_dir, day), ignore_errors=True)
+                        logging.info(f"Removed expired transcripts for {year}-{month}-{day}")
+                if not os.listdir(month_dir):
+                    os.rmdir(month_dir)
+            if not os.listdir(year_dir):
+                os.rmdir(year_dir)
+
+
+transcript_writer = TranscriptWriter(
+    root=settings.transcript_dir,
+    flush_interval=settings.transcript_flush_interval_seconds,
+    max_pending=settings.transcript_flush_max_pending,
+    retention_days=settings.transcript_retention_days,
+)
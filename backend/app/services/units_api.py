@@ -1,51 +1,100 @@
 # units_api.py
 
-from fastapi import FastAPI, HTTPException, Body
-from pymongo import MongoClient
+from fastapi import HTTPException, Body, Depends, Query
+from typing import Optional
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 
 from fastapi import APIRouter
-from pymongo import MongoClient
 
-MONGODB_URI = "mongo_db_url"
-DATABASE_NAME = "alertai"
+from app.core.config import settings
+from app.core.database import get_units_collection
+from app.services.change_feed import read_changes
+from app.services.event_hub import event_hub
+from app.services.units_service import units_service
+from pymongo import ReturnDocument
 
-client = MongoClient(MONGODB_URI)
-db = client[DATABASE_NAME]
 router = APIRouter()
 
 
 # Generic get count endpoint
 @router.get("/units/count")
-def get_unit_count(type: str, status: str = "available"):
-    count = db.units.count_documents({"type": type, "status": status})
+async def get_unit_count(type: str, status: str = "available", units=Depends(get_units_collection)):
+    count = await units.count_documents({"type": type, "status": status.lower()})
     return {"count": count}
 
+# Counts for every type and status in one response, served from memory
+@router.get("/units/summary")
+async def get_units_summary():
+    return units_service.summary()
+
+# Units written since a change token; omit "since" for a full read
+@router.get("/units/changes")
+async def get_unit_changes(since: Optional[str] = None,
+                           limit: int = Query(settings.changes_max_page_size, ge=1, le=settings.changes_max_page_size),
+                           units=Depends(get_units_collection)):
+    docs, next_token, has_more = await read_changes(units, since, limit, settings.changes_overlap_seconds)
+    for doc in docs:
+        doc.pop("_id", None)
+    return {"units": docs, "next": next_token, "has_more": has_more}
+
 # Get all units by type
 @router.get("/units/")
-def get_units(type: str):
-    units = list(db.units.find({"type": type}, {"_id": 0}))
-    return {"units": units}
+async def get_units(type: str, units=Depends(get_units_collection)):
+    result = await units.find({"type": type}, {"_id": 0}).to_list(length=None)
+    return {"units": result}
 
 # Update unit status
 @router.post("/units/update")
-def update_unit_status(unit_id: str = Body(...), status: str = Body(...)):
-    result = db.units.update_one(
+async def update_unit_status(unit_id: str = Body(...), status: str = Body(...), units=Depends(get_units_collection)):
+    status = status.lower()
+    changes = {"status": status, "last_updated": datetime.utcnow(), "updated_at": datetime.utcnow()}
+    previous = await units.find_one_and_update(
         {"unit_id": unit_id},
-        {"$set": {"status": status, "last_updated": datetime.utcnow()}}
+        {"$set": changes},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE,
     )
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Unit not found")
+    unit = {**previous, **changes}
+    units_service.track(unit)
+    units_service.count_change(unit["type"], previous.get("status"), status)
+    event_hub.publish("unit.updated", unit)
     return {"success": True, "unit_id": unit_id, "new_status": status}
 
+# Report a unit's current position (e.g. from its AVL/GPS feed)
+@router.post("/units/position")
+async def update_unit_position(unit_id: str = Body(...),
+                               latitude: float = Body(..., ge=-90, le=90),
+                               longitude: float = Body(..., ge=-180, le=180)):
+    unit = await units_service.update_position(unit_id, latitude, longitude)
+    if unit is None:
+        raise HTTPException(status_code=404, detail="Unit not found")
+    return {"success": True, "unit_id": unit_id, "latitude": latitude, "longitude": longitude}
+
 # Add a new unit (admin use)
 @router.post("/units/add")
-def add_unit(unit_id: str = Body(...), type: str = Body(...), location: str = Body(...)):
-    db.units.insert_one({
+async def add_unit(unit_id: str = Body(...), type: str = Body(...), location: str = Body(...),
+                   latitude: Optional[float] = Body(None, ge=-90, le=90),
+                   longitude: Optional[float] = Body(None, ge=-180, le=180),
+                   units=Depends(get_units_collection)):
+    unit = {
         "unit_id": unit_id,
         "type": type,
         "status": "available",
         "location": location,
-        "last_updated": datetime.utcnow()
-    })
+        "last_updated": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    if latitude is not None and longitude is not None:
+        unit["position"] = {"type": "Point", "coordinates": [longitude, latitude]}
+    try:
+        await units.insert_one(unit)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Unit already exists")
+    unit.pop("_id", None)
+    units_service.track(unit)
+    units_service.count_change(type, None, "available")
+    event_hub.publish("unit.updated", unit)
     return {"success": True, "unit_id": unit_id}
@@ -0,0 +1,322 @@
+# backend/app/services/units_service.py
+
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.core.database import database
+from app.services.event_hub import event_hub
+from app.services.mongodb_service import LIST_FIELDS, publish_emergency
+from app.services.spatial_grid import SpatialGrid
+from datetime import datetime
+import asyncio
+import logging
+
+AVAILABLE = "available"
+ASSIGNED = "assigned"
+
+
+class UnitsUnavailable(Exception):
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(", ".join(f"{count} more {unit_type}" for unit_type, count in shortages.items()))
+
+
+class EmergencyNotFound(Exception):
+    pass
+
+
+class UnitsService:
+    """Unit claims and dispatch.
+
+    A unit is claimed with a single find_one_and_update from "available" to
+    "assigned", so two dispatchers can never get the same unit. A dispatch
+    claims every requested unit and updates the emergency once, inside a
+    transaction when the deployment supports them (replica set or mongos).
+    On a standalone server the claims are released again if the dispatch
+    cannot be completed.
+
+    In "nearest" mode the closest available units to the emergency's
+    coordinates are claimed. Candidates come from an in-process grid of the
+    available, positioned units once it has been loaded, or from a $geoNear
+    query on the 2dsphere index otherwise. Either way the claim itself is the
+    same compare-and-set on status, so a stale candidate is simply skipped.
+
+    It also keeps a type x status counter map for /units/summary. Writers in
+    this process adjust it as they go; a periodic $group reconciles it with
+    the collection, which also picks up changes made by other workers.
+    """
+
+    def __init__(self, grid_cell_degrees=0.05, grid_refresh_seconds=60.0, summary_reconcile_seconds=30.0):
+        self._transactions = True
+        # Only available units are in the grid; _positions remembers the rest
+        self.grid = SpatialGrid(grid_cell_degrees)
+        self.grid_loaded = False
+        self._positions = {}
+        self.grid_refresh_seconds = grid_refresh_seconds
+        self.summary_reconcile_seconds = summary_reconcile_seconds
+        self._counts = {}
+        self._reconciled_at = None
+        self._tasks = []
+
+    @property
+    def collection(self):
+        return database.units
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._refresh_grid()),
+                           asyncio.create_task(self._reconcile_summary())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def summary(self):
+        """Unit counts by type and status, plus totals; no database round trip."""
+        by_type = {unit_type: dict(statuses) for unit_type, statuses in self._counts.items()}
+        totals = {}
+        for statuses in by_type.values():
+            for status, count in statuses.items():
+                totals[status] = totals.get(status, 0) + count
+        return {
+            "units": by_type,
+            "totals": totals,
+            "reconciled_at": self._reconciled_at,
+        }
+
+    def count_change(self, unit_type, old_status=None, new_status=None):
+        """Move one unit between counters; None means it was added or removed."""
+        if old_status == new_status:
+            return
+        statuses = self._counts.setdefault(unit_type, {})
+        if old_status is not None:
+            statuses[old_status] = max(0, statuses.get(old_status, 0) - 1)
+        if new_status is not None:
+            statuses[new_status] = statuses.get(new_status, 0) + 1
+
+    async def _reconcile_summary(self):
+        while True:
+            try:
+                groups = await self.collection.aggregate([
+                    {"$group": {"_id": {"type": "$type", "status": "$status"}, "count": {"$sum": 1}}},
+                ]).to_list(length=None)
+                counts = {}
+                for group in groups:
+                    counts.setdefault(group["_id"].get("type"), {})[group["_id"].get("status")] = group["count"]
+                self._counts = counts
+                self._reconciled_at = datetime.utcnow()
+            except Exception as e:
+                logging.error(f"Error reconciling unit summary: {str(e)}")
+            await asyncio.sleep(self.summary_reconcile_seconds)
+
+    async def _refresh_grid(self):
+        # Positions written by other workers reach this one on the next reload
+        while True:
+            try:
+                units = await self.collection.find(
+                    {"position": {"$exists": True}},
+                    {"_id": 0, "unit_id": 1, "type": 1, "status": 1, "position": 1},
+                ).to_list(length=None)
+                self.grid = SpatialGrid(self.grid.cell_degrees)
+                self._positions = {}
+                for unit in units:
+                    self.track(unit)
+                self.grid_loaded = True
+            except Exception as e:
+                logging.error(f"Error loading unit positions: {str(e)}")
+            await asyncio.sleep(self.grid_refresh_seconds)
+
+    async def update_position(self, unit_id, latitude, longitude):
+        """Store a unit's GeoJSON position; returns the updated unit or None."""
+        now = datetime.utcnow()
+        unit = await self.collection.find_one_and_update(
+            {"unit_id": unit_id},
+            {"$set": {"position": {"type": "Point", "coordinates": [longitude, latitude]},
+                      "last_updated": now, "updated_at": now}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if unit is not None:
+            self.track(unit)
+            event_hub.publish("unit.updated", unit)
+        return unit
+
+    def track(self, unit):
+        """Keep the grid in step with a unit document just read or written."""
+        unit_id = unit["unit_id"]
+        position = unit.get("position")
+        if position:
+            lon, lat = position["coordinates"]
+            self._positions[unit_id] = (unit["type"], lat, lon)
+        entry = self._positions.get(unit_id)
+        if entry is not None and unit.get("status") == AVAILABLE:
+            self.grid.set(unit_id, *entry)
+        else:
+            self.grid.discard(unit_id)
+
+    async def dispatch(self, call_id, requested, mode="any"):
+        """Claim ``requested`` ({unit_type: count}) units for a call.
+
+        ``mode`` is "any" or "nearest". Returns the claimed units as
+        [{"unit_id", "unit_type"}], plus "distance_km" for units picked by
+        distance. Raises UnitsUnavailable or EmergencyNotFound and leaves
+        nothing claimed.
+        """
+        origin = await self._emergency_position(call_id) if mode == "nearest" else None
+        distances = {}
+        if self._transactions:
+            try:
+                async with await database.client.start_session() as session:
+                    units, emergency = await session.with_transaction(
+                        lambda s: self._dispatch(call_id, requested, s, origin, distances)
+                    )
+            except OperationFailure as e:
+                # IllegalOperation: transactions need a replica set or mongos
+                if e.code != 20:
+                    raise
+                logging.warning("MongoDB transactions are unavailable; dispatch will release claims on failure")
+                self._transactions = False
+        if not self._transactions:
+            units, emergency = await self._dispatch(call_id, requested, None, origin, distances)
+
+        for unit in units:
+            self.track(unit)
+            self.count_change(unit["type"], AVAILABLE, ASSIGNED)
+            event_hub.publish("unit.updated", unit)
+        publish_emergency(emergency)
+        result = []
+        for unit in units:
+            entry = {"unit_id": unit["unit_id"], "unit_type": unit["type"]}
+            if unit["unit_id"] in distances:
+                entry["distance_km"] = round(distances[unit["unit_id"]], 3)
+            result.append(entry)
+        return result
+
+    async def _emergency_position(self, call_id):
+        emergency = await database.emergencies.find_one({"call_id": call_id}, {"latitude": 1, "longitude": 1})
+        if emergency is None:
+            raise EmergencyNotFound(call_id)
+        try:
+            return float(emergency["latitude"]), float(emergency["longitude"])
+        except (KeyError, TypeError, ValueError):
+            # Not geocoded (yet); any available unit will do
+            return None
+
+    async def _candidates(self, unit_type, origin, limit, skip):
+        """(distance_km, unit_id) pairs of available positioned units, closest first."""
+        if self.grid_loaded:
+            found = self.grid.nearest(unit_type, origin[0], origin[1], limit + len(skip))
+            return [(distance, unit_id) for distance, unit_id in found if unit_id not in skip][:limit]
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [origin[1], origin[0]]},
+                "key": "position",
+                "distanceField": "distance",
+                "spherical": True,
+                "query": {"type": unit_type, "status": AVAILABLE, "unit_id": {"$nin": list(skip)}},
+            }},
+            {"$limit": limit},
+            {"$project": {"_id": 0, "unit_id": 1, "distance": 1}},
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(length=limit)
+        return [(doc["distance"] / 1000.0, doc["unit_id"]) for doc in docs]
+
+    async def _claim(self, query, call_id, now, session):
+        return await self.collection.find_one_and_update(
+            {**query, "status": AVAILABLE},
+            {"$set": {"status": ASSIGNED, "assigned_call_id": call_id,
+                      "last_updated": now, "updated_at": now}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+
+    async def _dispatch(self, call_id, requested, session, origin=None, distances=None):
+        now = datetime.utcnow()
+        claimed = []
+        shortages = {}
+        for unit_type, count in requested.items():
+            remaining = count
+            skip = set()
+            while origin is not None and remaining:
+                candidates = await self._candidates(unit_type, origin, remaining, skip)
+                if not candidates:
+                    break
+                for distance, unit_id in candidates:
+                    skip.add(unit_id)
+                    unit = await self._claim({"unit_id": unit_id, "type": unit_type}, call_id, now, session)
+                    if unit is None:
+                        # Taken by someone else since the grid last heard about it
+                        self.grid.discard(unit_id)
+                    else:
+                        claimed.append(unit)
+                        distances[unit_id] = distance
+                        remaining -= 1
+            # Units without a position (or "any" mode) are taken in whatever order Mongo returns
+            while remaining:
+                unit = await self._claim({"type": unit_type}, call_id, now, session)
+                if unit is None:
+                    # None left of this type; further claims would only miss too
+                    shortages[unit_type] = remaining
+                    break
+                claimed.append(unit)
+                remaining -= 1
+
+        emergency = None
+        if not shortages:
+            emergency = await database.emergencies.find_one_and_update(
+                {"call_id": call_id},
+                {"$addToSet": {"assigned_unit": {"$each": [
+                    {"unit_id": unit["unit_id"], "unit_type": unit["type"]} for unit in claimed
+                ]}},
+                 "$set": {"status": ASSIGNED, "unassigned": False, "updated_at": now}},
+                projection=LIST_FIELDS,
+                return_document=ReturnDocument.AFTER,
+                session=session,
+            )
+
+        if shortages or emergency is None:
+            # Raising inside a transaction aborts it; without one, hand the
+            # claimed units back
+            if session is None:
+                await self._release(call_id, [unit["unit_id"] for unit in claimed])
+            if shortages:
+                raise UnitsUnavailable(shortages)
+            raise EmergencyNotFound(call_id)
+        return claimed, emergency
+
+    async def _release(self, call_id, unit_ids):
+        if not unit_ids:
+            return
+        now = datetime.utcnow()
+        await self.collection.update_many(
+            {"unit_id": {"$in": unit_ids}, "assigned_call_id": call_id},
+            {"$set": {"status": AVAILABLE, "last_updated": now, "updated_at": now},
+             "$unset": {"assigned_call_id": ""}},
+        )
+        for unit_id in unit_ids:
+            entry = self._positions.get(unit_id)
+            if entry is not None:
+                self.grid.set(unit_id, *entry)
+
+    async def normalize_statuses(self):
+        """Lower-case unit and emergency statuses written before they were consistent."""
+        for collection in (self.collection, database.emergencies):
+            try:
+                result = await collection.update_many(
+                    {"status": {"$regex": "[A-Z]"}},
+                    [{"$set": {"status": {"$toLower": "$status"}, "updated_at": "$$NOW"}}],
+                )
+                if result.modified_count:
+                    logging.info(f"Normalized status on {result.modified_count} {collection.name} document(s)")
+            except Exception as e:
+                logging.error(f"Error normalizing statuses on {collection.name}: {str(e)}")
+
+
+units_service = UnitsService(
+    grid_cell_degrees=settings.unit_grid_cell_degrees,
+    grid_refresh_seconds=settings.unit_grid_refresh_seconds,
+    summary_reconcile_seconds=settings.units_summary_reconcile_seconds,
+)
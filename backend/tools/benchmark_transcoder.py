@@ -0,0 +1,85 @@
+# backend/tools/benchmark_transcoder.py
+#
+# Compares the per-frame audioop path AzureSpeechService used to run with
+# MulawTranscoder. Run from the backend directory:
+#   python -m tools.benchmark_transcoder --frames 5000
+
+import argparse
+import base64
+import os
+import time
+import warnings
+
+import numpy as np
+
+from app.services.audio_transcoder import MulawTranscoder, ulaw_to_linear
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:  # removed in Python 3.13
+        audioop = None
+
+FRAME_BYTES = 160  # 20 ms of 8 kHz mu-law, the size Twilio sends
+
+
+def make_payloads(count):
+    return [base64.b64encode(os.urandom(FRAME_BYTES)).decode() for _ in range(count)]
+
+
+def run_audioop(payloads):
+    state = None
+    for payload in payloads:
+        audio = base64.b64decode(payload)
+        audio = audioop.ulaw2lin(audio, 2)
+        audio, state = audioop.ratecv(audio, 2, 1, 8000, 16000, state)
+
+
+def run_transcoder(payloads, frames_per_write):
+    transcoder = MulawTranscoder(frames_per_write=frames_per_write)
+    for payload in payloads:
+        transcoder.push(payload)
+    transcoder.flush()
+
+
+def timed(label, fn, frames, repeat):
+    best = min(_once(fn) for _ in range(repeat))
+    print(f"{label:<32} {best * 1e6 / frames:8.2f} us/frame  ({frames / best:,.0f} frames/s)")
+
+
+def _once(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.frames)
+
+    if audioop is not None:
+        raw = base64.b64decode(payloads[0])
+        exact = np.array_equal(
+            np.frombuffer(audioop.ulaw2lin(raw, 2), dtype=np.int16), ulaw_to_linear(raw)
+        )
+        print(f"mu-law table matches audioop: {exact}")
+        timed("audioop (per frame)", lambda: run_audioop(payloads), args.frames, args.repeat)
+    else:
+        print("audioop is not available on this Python; skipping baseline")
+
+    for frames_per_write in (1, 4, 10):
+        timed(
+            f"transcoder (batch={frames_per_write})",
+            lambda: run_transcoder(payloads, frames_per_write),
+            args.frames,
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
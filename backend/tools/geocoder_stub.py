@@ -0,0 +1,38 @@
+# backend/tools/geocoder_stub.py
+#
+# Minimal Nominatim stand-in for local testing. Serves /search from a JSON file
+# mapping location strings to [lat, lon]; unknown locations return [].
+#
+#   GEOCODER_STUB_FIXTURES=fixtures.json uvicorn tools.geocoder_stub:app --port 8081
+#   GEOCODER_URL=http://localhost:8081/search uvicorn app.services.main:app
+
+from fastapi import FastAPI
+import json
+import os
+
+from app.services.gazetteer import normalize_location
+
+app = FastAPI()
+
+_fixtures = {}
+_fixtures_path = os.getenv("GEOCODER_STUB_FIXTURES")
+if _fixtures_path:
+    with open(_fixtures_path, "r") as file:
+        _fixtures = {normalize_location(name): coords for name, coords in json.load(file).items()}
+
+request_count = 0
+
+
+@app.get("/search")
+def search(q: str, format: str = "json", limit: int = 1):
+    global request_count
+    request_count += 1
+    coords = _fixtures.get(normalize_location(q))
+    if coords is None:
+        return []
+    return [{"lat": str(coords[0]), "lon": str(coords[1]), "display_name": q}]
+
+
+@app.get("/stats")
+def stats():
+    return {"requests": request_count}
@@ -0,0 +1,66 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class BackendClient:
+    """Keep-alive HTTP client for the AlertAI backend.
+
+    One requests.Session with a connection pool sized for the dashboard's
+    threads, so calls reuse TCP connections instead of opening one each.
+    Every call has a (connect, read) timeout. GETs are retried on connection
+    errors and 502/503/504 with a short backoff; POSTs are not, since a
+    dispatch whose response was lost may already have happened.
+
+    ``fetch_all`` runs independent GETs in parallel, so a refresh takes as
+    long as its slowest request rather than the sum of them.
+    """
+
+    def __init__(self, base_url, timeout=(3.05, 10), retries=2, pool_size=10, max_workers=4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backend")
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def get(self, path, params=None):
+        return self.session.get(self.url(path), params=params, timeout=self.timeout)
+
+    def post(self, path, json=None):
+        return self.session.post(self.url(path), json=json, timeout=self.timeout)
+
+    def fetch_all(self, requests_by_name):
+        """GET ``{name: (path, params)}`` concurrently; returns ``{name: Response or None}``.
+
+        A request that fails outright (timeout, connection refused, retries
+        exhausted) comes back as None so the others can still be used.
+        """
+        futures = {name: self._executor.submit(self.get, path, params)
+                   for name, (path, params) in requests_by_name.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logging.warning(f"Backend request {name} failed: {str(e)}")
+                results[name] = None
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
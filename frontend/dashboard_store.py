@@ -0,0 +1,276 @@
+import bisect
+import itertools
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+PRIORITY_RANK = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+
+
+def sort_key(record):
+    """Dashboard order: unassigned first, then HIGH..LOW, newest first."""
+    unassigned = record.get("unassigned")
+    if unassigned is None:
+        unassigned = str(record.get("status") or "unassigned").lower() == "unassigned"
+    rank = record.get("priority_rank")
+    if rank is None:
+        rank = PRIORITY_RANK.get(record.get("priority"), 2)
+    try:
+        newest_first = -datetime.fromisoformat(str(record.get("time"))).timestamp()
+    except ValueError:
+        newest_first = float("inf")
+    return (0 if unassigned else 1, rank, newest_first, record.get("call_id", ""))
+
+
+def updated_at(record):
+    """Parsed ``updated_at`` of a backend record, or None if it has none."""
+    try:
+        return datetime.fromisoformat(str(record["updated_at"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ChunkedRows:
+    """Immutable sequence over a tuple of tuples, without flattening them.
+
+    Snapshots share unchanged chunks with the store, so taking one costs
+    time in proportion to the number of chunks, not rows. ``item`` maps each
+    stored element to the value handed out (e.g. sort key -> call_id).
+    """
+
+    def __init__(self, chunks=(), item=None):
+        self._chunks = chunks
+        self._item = item
+        self._starts = list(itertools.accumulate((len(chunk) for chunk in chunks), initial=0))
+
+    def __len__(self):
+        return self._starts[-1]
+
+    def __iter__(self):
+        values = itertools.chain.from_iterable(self._chunks)
+        return map(self._item, values) if self._item else values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return tuple(itertools.islice(self, start, stop, step))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        chunk = bisect.bisect_right(self._starts, index) - 1
+        value = self._chunks[chunk][index - self._starts[chunk]]
+        return self._item(value) if self._item else value
+
+
+class Page:
+    """One page of a (possibly filtered) snapshot.
+
+    ``call_ids[i]`` is the call_id shown in row ``i`` of this page, so a
+    table click can be resolved without re-sorting anything.
+    """
+
+    def __init__(self, version, offset, size, total, rows, call_ids, columns):
+        self.version = version
+        self.offset = offset
+        self.size = size
+        self.total = total
+        self.rows = rows
+        self.call_ids = call_ids
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.rows)
+
+    def dataframe(self):
+        return pd.DataFrame.from_records(self.rows, columns=self.columns)
+
+
+class Snapshot:
+    """Read-only view of the store at one version.
+
+    ``rows`` are the derived display rows in dashboard order and ``ids``
+    their call_ids. Filtered row lists are cached per filter key.
+    """
+
+    MAX_FILTERS = 16
+
+    def __init__(self, version, rows, counts, columns, ids=()):
+        self.version = version
+        self.rows = rows
+        self.ids = ids
+        self.counts = counts
+        self.columns = columns
+        self._filtered = {}  # filter key -> positions in rows
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def page(self, offset, size, where=None, key=None):
+        """Rows ``offset`` to ``offset + size`` of those matching ``where(row)``.
+
+        ``key`` identifies the filter (hashable); sessions using the same
+        filters on the same version share one pass over the rows.
+        """
+        if where is None:
+            positions = range(len(self.rows))
+        else:
+            with self._lock:
+                positions = self._filtered.get(key)
+            if positions is None:
+                positions = [i for i, row in enumerate(self.rows) if where(row)]
+                with self._lock:
+                    if len(self._filtered) >= self.MAX_FILTERS:
+                        self._filtered.clear()
+                    self._filtered[key] = positions
+        total = len(positions)
+        # Clamp to the last page when the result shrank under the reader
+        offset = max(0, min(offset, (total - 1) // size * size if total else 0))
+        window = positions[offset:offset + size]
+        return Page(self.version, offset, size, total,
+                    tuple(self.rows[i] for i in window), tuple(self.ids[i] for i in window), self.columns)
+
+
+class DashboardStore:
+    """Emergency records keyed by call_id, updated one record at a time.
+
+    ``derive(record)`` turns a backend record into a display row; it only
+    runs for records that actually changed. The dashboard order is kept as
+    a list of sorted chunks of at most CHUNK_SIZE keys (with their rows
+    alongside), found by bisecting the chunk maxima. Changing a record
+    copies only its chunk, and a snapshot only copies the chunk list, so
+    the cost of a change grows with the chunk count rather than the number
+    of records.
+
+    Records carry ``updated_at``. The change feed and push events arrive on
+    different threads and can race, so a record older than the stored copy
+    is ignored.
+    """
+
+    CHUNK_SIZE = 256
+
+    def __init__(self, derive, columns):
+        self.derive = derive
+        self.columns = columns
+        self._records = {}     # call_id -> (raw record, sort key, row)
+        self._key_chunks = []  # sorted tuples of sort keys
+        self._row_chunks = []  # rows for the keys at the same positions
+        self._maxes = []       # last key of each chunk
+        self._counts = {"unassigned": 0, "assigned": 0}
+        self._version = 0
+        self._snapshot = Snapshot(0, (), dict(self._counts), columns)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def subscribe(self, callback):
+        """Call ``callback()`` after every apply that bumped the version."""
+        self._listeners.append(callback)
+
+    def apply(self, records):
+        """Upsert backend records; returns True if anything visible changed."""
+        changed = False
+        with self._lock:
+            for record in records:
+                call_id = record.get("call_id")
+                if not call_id:
+                    continue
+                previous = self._records.get(call_id)
+                if previous is not None:
+                    if previous[0] == record:
+                        # Delta feeds re-send recent records; identical ones are free
+                        continue
+                    stored, incoming = updated_at(previous[0]), updated_at(record)
+                    if stored and incoming and incoming < stored:
+                        # A change page read before a write, applied after its push event
+                        continue
+                    self._remove(previous[1])
+                key = sort_key(record)
+                row = self.derive(record)
+                self._insert(key, row)
+                self._records[call_id] = (record, key, row)
+                self._counts["unassigned" if key[0] == 0 else "assigned"] += 1
+                changed = True
+            if changed:
+                self._version += 1
+        if changed:
+            for callback in self._listeners:
+                callback()
+        return changed
+
+    def _insert(self, key, row):
+        if not self._key_chunks:
+            self._key_chunks.append((key,))
+            self._row_chunks.append((row,))
+            self._maxes.append(key)
+            return
+        chunk = min(bisect.bisect_left(self._maxes, key), len(self._maxes) - 1)
+        keys, rows = list(self._key_chunks[chunk]), list(self._row_chunks[chunk])
+        index = bisect.bisect_left(keys, key)
+        keys.insert(index, key)
+        rows.insert(index, row)
+        if len(keys) > self.CHUNK_SIZE:
+            half = len(keys) // 2
+            self._key_chunks[chunk:chunk + 1] = [tuple(keys[:half]), tuple(keys[half:])]
+            self._row_chunks[chunk:chunk + 1] = [tuple(rows[:half]), tuple(rows[half:])]
+            self._maxes[chunk:chunk + 1] = [keys[half - 1], keys[-1]]
+        else:
+            self._key_chunks[chunk] = tuple(keys)
+            self._row_chunks[chunk] = tuple(rows)
+            self._maxes[chunk] = keys[-1]
+
+    def _remove(self, key):
+        self._counts["unassigned" if key[0] == 0 else "assigned"] -= 1
+        chunk = bisect.bisect_left(self._maxes, key)
+        if chunk == len(self._maxes):
+            return
+        keys = list(self._key_chunks[chunk])
+        index = bisect.bisect_left(keys, key)
+        if index == len(keys) or keys[index] != key:
+            return
+        del keys[index]
+        if not keys:
+            del self._key_chunks[chunk], self._row_chunks[chunk], self._maxes[chunk]
+            return
+        rows = list(self._row_chunks[chunk])
+        del rows[index]
+        self._key_chunks[chunk] = tuple(keys)
+        self._row_chunks[chunk] = tuple(rows)
+        self._maxes[chunk] = keys[-1]
+        if len(keys) < self.CHUNK_SIZE // 4 and len(self._key_chunks) > 1:
+            self._merge(chunk)
+
+    def _merge(self, chunk):
+        # Fold a small chunk into a neighbour so records moving around don't
+        # leave a long tail of tiny chunks behind; split again if that overflows
+        left = chunk - 1 if chunk == len(self._key_chunks) - 1 else chunk
+        keys = self._key_chunks[left] + self._key_chunks[left + 1]
+        rows = self._row_chunks[left] + self._row_chunks[left + 1]
+        if len(keys) > self.CHUNK_SIZE:
+            half = len(keys) // 2
+            self._key_chunks[left:left + 2] = [keys[:half], keys[half:]]
+            self._row_chunks[left:left + 2] = [rows[:half], rows[half:]]
+            self._maxes[left:left + 2] = [keys[half - 1], keys[-1]]
+        else:
+            self._key_chunks[left:left + 2] = [keys]
+            self._row_chunks[left:left + 2] = [rows]
+            self._maxes[left:left + 2] = [keys[-1]]
+
+    def get(self, call_id):
+        entry = self._records.get(call_id)
+        return entry[2] if entry is not None else None
+
+    def snapshot(self):
+        """Current rows as an immutable Snapshot, rebuilt at most once per version."""
+        with self._lock:
+            if self._snapshot.version != self._version:
+                key_chunks = tuple(self._key_chunks)
+                rows = ChunkedRows(tuple(self._row_chunks))
+                ids = ChunkedRows(key_chunks, item=lambda key: key[-1])
+                self._snapshot = Snapshot(self._version, rows, dict(self._counts), self.columns, ids)
+            return self._snapshot
@@ -0,0 +1,113 @@
+import logging
+import threading
+from collections import OrderedDict
+
+
+class DashboardView:
+    """Everything a session shows for one (emergency version, resources version).
+
+    Built once by the broadcaster and handed to every session as is.
+    """
+
+    def __init__(self, version, snapshot, counts, resource_labels, map_html, page, table):
+        self.version = version
+        self.snapshot = snapshot
+        self.counts = counts
+        self.resource_labels = resource_labels
+        self.map_html = map_html
+        self.page = page
+        self.table = table
+
+
+class DashboardBroadcaster(threading.Thread):
+    """Single producer of the dashboard view model.
+
+    The thread wakes when the store or the unit counters change and builds
+    one DashboardView: counts, the unfiltered first table page, the map and
+    the resource labels. Sessions poll ``current()`` and compare versions,
+    so an unchanged dashboard costs them one comparison, and a dozen open
+    tabs cost the same as one. Pages other than the default one (another
+    offset, or filters) are built on demand and cached per view version, so
+    sessions looking at the same page share them too.
+    """
+
+    def __init__(self, store, map_layer, page_size, table_columns, max_pages=32):
+        super().__init__(daemon=True)
+        self.store = store
+        self.map_layer = map_layer
+        self.page_size = page_size
+        self.table_columns = table_columns
+        self.max_pages = max_pages
+        self._resources = {}
+        self._resources_version = 0
+        self._view = None
+        self._pages = OrderedDict()  # (view version, offset, filter key) -> (page, table)
+        self._changed = threading.Event()
+        self._build_lock = threading.Lock()
+        self._pages_lock = threading.Lock()
+        store.subscribe(self.notify)
+
+    def notify(self):
+        self._changed.set()
+
+    def set_resources(self, resources):
+        """Replace the resource counters; only a real change produces a new view."""
+        if resources != self._resources:
+            self._resources = dict(resources)
+            self._resources_version += 1
+            self.notify()
+
+    def run(self):
+        while True:
+            self._changed.wait()
+            self._changed.clear()
+            try:
+                self.publish()
+            except Exception as e:
+                logging.error(f"Dashboard view build failed: {str(e)}")
+
+    def current(self):
+        """Latest published view; built inline only before the first publish."""
+        return self._view or self.publish()
+
+    def publish(self):
+        with self._build_lock:
+            version = (self.store.version, self._resources_version)
+            if self._view is not None and self._view.version == version:
+                return self._view
+            snapshot = self.store.snapshot()
+            resources = self._resources
+            page = snapshot.page(0, self.page_size)
+            view = DashboardView(
+                version=(snapshot.version, version[1]),
+                snapshot=snapshot,
+                counts=(f"{snapshot.counts['unassigned']}", f"{snapshot.counts['assigned']}"),
+                resource_labels=(
+                    f"Police Units: {resources.get('Police Units', 0)}",
+                    f"Ambulances: {resources.get('Ambulances', 0)}",
+                    f"Fire Trucks: {resources.get('Fire Trucks', 0)}",
+                ),
+                map_html=self.map_layer.html(snapshot),
+                page=page,
+                table=page.dataframe()[self.table_columns],
+            )
+            self._view = view
+            return view
+
+    def page(self, view, offset=0, key=None, where=None):
+        """(Page, table DataFrame) of ``view`` at ``offset`` with the given filter."""
+        if offset == 0 and where is None:
+            return view.page, view.table
+        cache_key = (view.version, offset, key)
+        with self._pages_lock:
+            cached = self._pages.get(cache_key)
+            if cached is not None:
+                self._pages.move_to_end(cache_key)
+                return cached
+        page = view.snapshot.page(offset, self.page_size, where, key)
+        result = (page, page.dataframe()[self.table_columns])
+        with self._pages_lock:
+            self._pages[cache_key] = result
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return result
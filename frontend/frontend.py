@@ -1,16 +1,29 @@
 import gradio as gr
-import pandas as pd
-import folium
+import logging
 import threading
-import time
-import requests
 
-API_BASE_URL = "http://localhost:8000"
-ASSIGN_API_URL = f"{API_BASE_URL}/assign_unit"
+from backend_client import BackendClient
+from dashboard_store import DashboardStore
+from dashboard_view import DashboardBroadcaster
+from live_feed import LiveFeed
+from map_layer import MapLayer
 
-data_lock = threading.Lock()
-emergencies = pd.DataFrame()
-resources = {'Police Units': 0, 'Ambulances': 0, 'Fire Trucks': 0}
+API_BASE_URL = "http://localhost:8000"
+LIVE_FEED_URL = "ws://localhost:8000/ws/dashboard"
+# Safety net for when the live feed is down; normally refreshes are pushed
+FALLBACK_REFRESH_SECONDS = 30
+# Rows per table page; keeps each refresh's payload bounded however long the shift
+DASHBOARD_PAGE_SIZE = 50
+FILTER_ALL = "All"
+
+TABLE_COLUMNS = ['ID', 'PRIORITY_DISPLAY', 'CALLER', 'EMERGENCY', 'TIME', 'LOCATION', 'STATUS', 'ASSIGNED_UNIT_DISPLAY']
+ROW_COLUMNS = ['ID', 'PRIORITY', 'PRIORITY_DISPLAY', 'CALLER', 'EMERGENCY', 'TIME', 'LOCATION',
+               'LAT', 'LON', 'STATUS', 'ASSIGNED_UNIT', 'ASSIGNED_UNIT_DISPLAY']
+
+backend = BackendClient(API_BASE_URL)
+refresh_needed = threading.Event()
+# Position in the backend's change feed; None until the first full read
+change_token = None
 
 UNIT_TYPE_MAP = {
     "Police": "police",
@@ -33,27 +46,22 @@ def assigned_unit_display(assigned):
 def assign_units(call_id, unit_types):
     if not call_id or not unit_types:
         return "Please select at least one unit type and a valid emergency.", None
-    results = []
+    # One request claims the closest available unit of each selected type; the
+    # backend assigns all or none
+    payload = {"call_id": call_id, "units": {UNIT_TYPE_MAP[ut]: 1 for ut in unit_types}, "mode": "nearest"}
     assigned_units = []
-    for ut in unit_types:
-        payload = {"call_id": call_id, "unit_type": UNIT_TYPE_MAP[ut]}
-        try:
-            resp = requests.post(ASSIGN_API_URL, json=payload)
-            if resp.ok:
-                try:
-                    rjson = resp.json()
-                    assigned_unit = rjson.get("assigned_unit", "")
-                    unit_type = rjson.get("unit_type", ut)
-                    if assigned_unit:
-                        assigned_units.append({"unit_id": assigned_unit, "unit_type": unit_type})
-                except Exception:
-                    assigned_units.append({"unit_id": "", "unit_type": ut})
-                results.append(f"{ut} assigned.")
-            else:
-                results.append(f"{ut}: {resp.text}")
-        except Exception as e:
-            results.append(f"{ut}: error {str(e)}")
-    msg = "Unit(s) assigned successfully" if all("assigned." in r for r in results) else "; ".join(results)
+    try:
+        resp = backend.post("/dispatch", json=payload)
+        if resp.ok:
+            assigned_units = resp.json().get("assigned_units", [])
+            msg = "Unit(s) assigned successfully"
+        else:
+            try:
+                msg = resp.json().get("detail", resp.text)
+            except Exception:
+                msg = resp.text
+    except Exception as e:
+        msg = f"error {str(e)}"
     assignment_status_map[call_id] = msg
     if assigned_units:
         if call_id in assigned_unit_map:
@@ -72,133 +80,163 @@ def get_priority_indicator(priority):
     else:
         return '🟢 LOW'
 
-def fetch_from_api():
+def fetch_emergency_details(call_id):
     try:
-        resp = requests.get(f"{API_BASE_URL}/emergencies")
-        api_json = resp.json() if resp.ok else {}
-        if isinstance(api_json, dict):
-            emergencies_list = api_json.get("emergencies", [])
-        elif isinstance(api_json, list):
-            emergencies_list = api_json
-        else:
-            emergencies_list = []
+        resp = backend.get(f"/emergencies/by_call_id/{call_id}")
+        return resp.json() if resp.ok else {}
     except Exception:
-        emergencies_list = []
-
-    df = pd.DataFrame(emergencies_list)
-
-    resources['Police Units'] = get_unit_count("police")
-    resources['Ambulances'] = get_unit_count("ambulance")
-    resources['Fire Trucks'] = get_unit_count("fire_truck")
-
-    ui_columns = [
-        'ID', 'PRIORITY', 'CALLER', 'EMERGENCY', 'TIME', 'LOCATION',
-        'LAT', 'LON', 'STATUS', 'ASSIGNED_UNIT', 'TRANSCRIPT', 'AI_RECOMMENDATION'
-    ]
-    if not df.empty:
-        df['ID'] = df.get('call_id', df.index)
-        df['PRIORITY'] = df.get('priority', 'LOW').fillna('LOW')
-        df['PRIORITY_DISPLAY'] = df['PRIORITY'].apply(get_priority_indicator)
-        df['CALLER'] = df.get('caller_name', '')
-        df['EMERGENCY'] = df.get('emergency_type', '')
-        df['TIME'] = df.get('time', '')
-        df['LOCATION'] = df.get('location', '')
-        df['STATUS'] = df.get('status', 'UNASSIGNED').fillna('UNASSIGNED').str.upper()
-        df['LAT'] = df.get('latitude', '')
-        df['LON'] = df.get('longitude', '')
-        df['ASSIGNED_UNIT'] = df.get('assigned_unit', '')
-        df['ASSIGNED_UNIT_DISPLAY'] = df['ASSIGNED_UNIT'].apply(assigned_unit_display)
-        df['TRANSCRIPT'] = df.get('transcript', '')
-        df['AI_RECOMMENDATION'] = df.get('ai_recommendation', df.get('recommended_actions', ''))
-        for col in ui_columns + ['ASSIGNED_UNIT_DISPLAY', 'PRIORITY_DISPLAY']:
-            if col not in df:
-                df[col] = ""
-    else:
-        df = pd.DataFrame(columns=ui_columns + ['ASSIGNED_UNIT_DISPLAY', 'PRIORITY_DISPLAY'])
-    return df
+        return {}
+
+def derive_row(record):
+    # Display columns for one record; only runs when that record changes
+    assigned = record.get('assigned_unit') or ''
+    return {
+        'ID': record.get('call_id', ''),
+        'PRIORITY': record.get('priority') or 'LOW',
+        'PRIORITY_DISPLAY': get_priority_indicator(record.get('priority') or 'LOW'),
+        'CALLER': record.get('caller_name') or '',
+        'EMERGENCY': record.get('emergency_type') or '',
+        'TIME': record.get('time') or '',
+        'LOCATION': record.get('location') or '',
+        'LAT': record.get('latitude', ''),
+        'LON': record.get('longitude', ''),
+        'STATUS': str(record.get('status') or 'unassigned').upper(),
+        'ASSIGNED_UNIT': assigned,
+        'ASSIGNED_UNIT_DISPLAY': assigned_unit_display(assigned),
+    }
+
+store = DashboardStore(derive_row, ROW_COLUMNS)
+# Shared by every session; renders each data version once
+map_layer = MapLayer()
+# Builds the dashboard view once per change and hands it to every session
+broadcaster = DashboardBroadcaster(store, map_layer, DASHBOARD_PAGE_SIZE, TABLE_COLUMNS)
+
+def change_params():
+    return {"since": change_token} if change_token else {}
+
+def sync_emergencies(resp):
+    # Apply one page of changes, then follow has_more; the first sync reads everything
+    global change_token
+    while resp is not None:
+        if resp.status_code == 400 and change_token:
+            # Token no longer understood; start over with a full read
+            change_token = None
+        elif not resp.ok:
+            return
+        else:
+            page = resp.json()
+            store.apply(page.get("emergencies", []))
+            change_token = page.get("next") or change_token
+            if not page.get("has_more"):
+                return
+        try:
+            resp = backend.get("/emergencies/changes", params=change_params())
+        except Exception:
+            return
 
-def get_unit_count(unit_type):
+def apply_unit_summary(resp):
+    # One request for every unit type and status
     try:
-        resp = requests.get(f"{API_BASE_URL}/units/count", params={"type": unit_type})
-        if resp.status_code == 200:
-            count = resp.json().get("count", 0)
-            return count
-        return 0
-    except Exception:
-        return 0
+        units = resp.json().get("units", {}) if resp is not None and resp.status_code == 200 else {}
+    except ValueError:
+        units = {}
+    broadcaster.set_resources({
+        'Police Units': units.get("police", {}).get("available", 0),
+        'Ambulances': units.get("ambulance", {}).get("available", 0),
+        'Fire Trucks': units.get("fire_truck", {}).get("available", 0),
+    })
+
+def refresh_from_backend():
+    # Emergencies and units are independent, so fetch them side by side
+    results = backend.fetch_all({
+        "changes": ("/emergencies/changes", change_params()),
+        "units": ("/units/summary", None),
+    })
+    apply_unit_summary(results["units"])
+    sync_emergencies(results["changes"])
 
 def updater():
-    global emergencies
     while True:
-        time.sleep(5)
-        with data_lock:
-            emergencies = fetch_from_api()
+        # Woken by the live feed; bursts of events collapse into one sync
+        refresh_needed.wait(timeout=FALLBACK_REFRESH_SECONDS)
+        refresh_needed.clear()
+        try:
+            refresh_from_backend()
+        except Exception as e:
+            # Never let one bad response stop the updater thread
+            logging.error(f"Dashboard refresh failed: {str(e)}")
 
-threading.Thread(target=updater, daemon=True).start()
+def on_live_event(event):
+    # Emergency events carry the full list-view record, so they apply directly
+    if event.get("type", "").startswith("emergency.") and event.get("data"):
+        store.apply([event["data"]])
+    else:
+        refresh_needed.set()
 
-def create_map(highlight_id=None):
-    m = folium.Map(location=[39.8283, -98.5795], zoom_start=4)  # Center USA, zoomed out
-    with data_lock:
-        for _, row in emergencies.iterrows():
-            lat, lon = row['LAT'], row['LON']
-            try:
-                lat = float(lat)
-                lon = float(lon)
-            except:
-                continue
-            icon_color = 'blue' if highlight_id is not None and row['ID'] == highlight_id else (
-                'red' if 'HIGH' in row['PRIORITY'] else
-                'orange' if 'MEDIUM' in row['PRIORITY'] else 'green')
-            popup = f"ID: {row['ID']}, {row['EMERGENCY']}, Priority: {row['PRIORITY']}"
-            folium.Marker([lat, lon], popup=popup, icon=folium.Icon(color=icon_color)).add_to(m)
-    return m._repr_html_()
-
-# -------------- NEW: Always use the same sorting for both display and selection --------------
-def get_sorted_emergencies_df():
-    df = emergencies.copy()
-    if df.empty:
-        return df
-    def prio_num(priority_str):
-        if isinstance(priority_str, str):
-            if 'HIGH' in priority_str:
-                return 3
-            elif 'MEDIUM' in priority_str:
-                return 2
-            elif 'LOW' in priority_str:
-                return 1
-        return 0
-    df['PRIORITY_NUM'] = df['PRIORITY'].apply(prio_num)
-    df['IS_UNASSIGNED'] = (df['STATUS'] == 'UNASSIGNED').astype(int)
-    df = df.sort_values(by=['IS_UNASSIGNED', 'PRIORITY_NUM'], ascending=[False, False])
-    df = df.drop(columns=['PRIORITY_NUM', 'IS_UNASSIGNED'])
-    return df
-
-def update_dashboard():
-    with data_lock:
-        df = get_sorted_emergencies_df()
-        if df.empty:
-            table_data = pd.DataFrame(columns=['ID', 'PRIORITY_DISPLAY', 'CALLER',
-                                               'EMERGENCY', 'TIME', 'LOCATION', 'STATUS', 'ASSIGNED_UNIT_DISPLAY'])
-            return ["0", "0", table_data, "", "0", "0", "0"]
-
-        unassigned = len(df[df['STATUS'] == 'UNASSIGNED'])
-        assigned = len(df[df['STATUS'] == 'ASSIGNED'])
-        table_data = df[['ID', 'PRIORITY_DISPLAY', 'CALLER',
-                         'EMERGENCY', 'TIME', 'LOCATION', 'STATUS', 'ASSIGNED_UNIT_DISPLAY']].reset_index(drop=True)
-    return [f"{unassigned}", f"{assigned}", table_data,
-            create_map(), f"Police Units: {resources['Police Units']}",
-            f"Ambulances: {resources['Ambulances']}", f"Fire Trucks: {resources['Fire Trucks']}"]
-
-def get_emergency_details(evt: gr.SelectData):
+broadcaster.start()
+threading.Thread(target=updater, daemon=True).start()
+LiveFeed(LIVE_FEED_URL, on_event=on_live_event, on_resync=refresh_needed.set).start()
+
+def table_filter(status=FILTER_ALL, priority=FILTER_ALL, emergency_type="", search=""):
+    """(key, predicate) for Snapshot.page; predicate is None when nothing is filtered."""
+    status = status if status and status != FILTER_ALL else None
+    priority = priority if priority and priority != FILTER_ALL else None
+    emergency_type = (emergency_type or "").strip().lower()
+    search = (search or "").strip().lower()
+    key = (status, priority, emergency_type, search)
+    if key == (None, None, "", ""):
+        return key, None
+
+    def where(row):
+        if status and row['STATUS'] != status.upper():
+            return False
+        if priority and row['PRIORITY'] != priority:
+            return False
+        if emergency_type and emergency_type not in str(row['EMERGENCY']).lower():
+            return False
+        if search and search not in str(row['CALLER']).lower() and search not in str(row['LOCATION']).lower():
+            return False
+        return True
+    return key, where
+
+def page_label(page):
+    if not page.total:
+        return "No matching emergencies"
+    return f"Showing {page.offset + 1}-{page.offset + len(page)} of {page.total}"
+
+def update_dashboard(offset=0, status=FILTER_ALL, priority=FILTER_ALL, emergency_type="", search="", view=None):
+    # Views are built once and immutable; sessions only pick their page
+    view = view or broadcaster.current()
+    key, where = table_filter(status, priority, emergency_type, search)
+    page, table_data = broadcaster.page(view, offset, key, where)
+    return list(view.counts) + [table_data, view.map_html] + list(view.resource_labels) + [
+        page_label(page), page]
+
+def refresh_dashboard(seen_version, page, status, priority, emergency_type, search):
+    # Polled every second per session, but only redraws when the view changed
+    view = broadcaster.current()
+    if view.version == seen_version:
+        return [gr.update()] * 9 + [seen_version]
+    offset = page.offset if page is not None else 0
+    return update_dashboard(offset, status, priority, emergency_type, search, view) + [view.version]
+
+def filter_dashboard(status, priority, emergency_type, search):
+    # New filters start from the first page
+    return update_dashboard(0, status, priority, emergency_type, search)
+
+def turn_page(page, step, status, priority, emergency_type, search):
+    offset = page.offset + step * DASHBOARD_PAGE_SIZE if page is not None else 0
+    return update_dashboard(offset, status, priority, emergency_type, search)
+
+def get_emergency_details(page, evt: gr.SelectData):
     index = evt.index[0] if isinstance(evt.index, list) else evt.index
-    df = get_sorted_emergencies_df()
-    table_data = df[['ID', 'PRIORITY_DISPLAY', 'CALLER',
-                     'EMERGENCY', 'TIME', 'LOCATION', 'STATUS', 'ASSIGNED_UNIT', 'ASSIGNED_UNIT_DISPLAY']].reset_index(drop=True)
-    if index >= len(table_data):
+    # Resolve the click against the page this session is looking at
+    if page is None or index >= len(page):
         return [gr.update()] * 10 + [gr.update(value=[]), gr.update(value="")]
 
-    selected_id = table_data.loc[index, 'ID']
-    row = df[df['ID'] == selected_id].iloc[0]
+    selected_id = page.call_ids[index]
+    row = store.get(selected_id) or page.rows[index]
+    details = fetch_emergency_details(selected_id)
     assign_status = assignment_status_map.get(selected_id, "")
     assigned_unit_display_str = assigned_unit_display(row['ASSIGNED_UNIT'])
     status_message = ""
@@ -210,42 +248,41 @@ def get_emergency_details(evt: gr.SelectData):
     return [
         row['ID'], row['PRIORITY_DISPLAY'], row['CALLER'],
         row['EMERGENCY'], row['TIME'], row['LOCATION'], row['STATUS'],
-        row['TRANSCRIPT'], row['AI_RECOMMENDATION'],
+        details.get('transcript', ''), details.get('ai_recommendation', ''),
         gr.update(value=[]),
         gr.update(value=status_message)
     ]
 
 def load_initial_details():
-    with data_lock:
-        df = get_sorted_emergencies_df()
-        if df.empty:
-            return [gr.update()] * 11
-
-        def score(p):
-            if 'HIGH' in p:
-                return 3
-            elif 'MEDIUM' in p:
-                return 2
-            return 1
-
-        df['PRIORITY_SCORE'] = df['PRIORITY'].map(score)
-        df = df.sort_values(by=['PRIORITY_SCORE'], ascending=[False])
-        row = df.iloc[0]
-        assign_status = assignment_status_map.get(row.get('ID'), "")
-        assigned_unit_display_str = assigned_unit_display(row.get('ASSIGNED_UNIT'))
-        status_message = ""
-        if assigned_unit_display_str:
-            status_message = f"Assigned Unit(s): {assigned_unit_display_str}"
-        elif assign_status:
-            status_message = assign_status
-
-        return [
-            row.get('ID'), row.get('PRIORITY_DISPLAY'), row.get('CALLER'),
-            row.get('EMERGENCY'), row.get('TIME'), row.get('LOCATION'), row.get('STATUS'),
-            row.get('TRANSCRIPT', ''), row.get('AI_RECOMMENDATION', ''),
-            gr.update(value=[]),
-            gr.update(value=status_message)
-        ]
+    rows = store.snapshot().rows
+    if not rows:
+        return [gr.update()] * 11
+
+    def score(p):
+        if 'HIGH' in p:
+            return 3
+        elif 'MEDIUM' in p:
+            return 2
+        return 1
+
+    # Highest priority first; rows are already in dashboard order for ties
+    row = max(rows, key=lambda r: score(r['PRIORITY']))
+    details = fetch_emergency_details(row.get('ID'))
+    assign_status = assignment_status_map.get(row.get('ID'), "")
+    assigned_unit_display_str = assigned_unit_display(row.get('ASSIGNED_UNIT'))
+    status_message = ""
+    if assigned_unit_display_str:
+        status_message = f"Assigned Unit(s): {assigned_unit_display_str}"
+    elif assign_status:
+        status_message = assign_status
+
+    return [
+        row.get('ID'), row.get('PRIORITY_DISPLAY'), row.get('CALLER'),
+        row.get('EMERGENCY'), row.get('TIME'), row.get('LOCATION'), row.get('STATUS'),
+        details.get('transcript', ''), details.get('ai_recommendation', ''),
+        gr.update(value=[]),
+        gr.update(value=status_message)
+    ]
 
 css = """
 /* Highlight the full row in the gradio dataframe when any cell is selected */
@@ -285,6 +322,11 @@ with gr.Blocks(theme="soft", css=css) as demo:
     gr.Markdown("---")
 
     gr.Markdown("## 🚨 Live Emergencies")
+    with gr.Row():
+        status_filter = gr.Dropdown([FILTER_ALL, "Unassigned", "Assigned"], value=FILTER_ALL, label="Status")
+        priority_filter = gr.Dropdown([FILTER_ALL, "HIGH", "MEDIUM", "LOW"], value=FILTER_ALL, label="Priority")
+        type_filter = gr.Textbox(label="Emergency Type", placeholder="e.g. fire (press Enter)")
+        search_box = gr.Textbox(label="Search", placeholder="Caller or location (press Enter)")
     with gr.Row():
         with gr.Column(scale=2):
             emergency_table = gr.Dataframe(
@@ -294,6 +336,10 @@ with gr.Blocks(theme="soft", css=css) as demo:
                 interactive=False,
                 height=500,
             )
+            with gr.Row():
+                prev_page_btn = gr.Button("◀ Previous", size="sm")
+                page_info = gr.Markdown("")
+                next_page_btn = gr.Button("Next ▶", size="sm")
         with gr.Column(scale=1):
             map_component = gr.HTML(label="Emergency Locations", elem_id="map_html")
 
@@ -320,18 +366,31 @@ with gr.Blocks(theme="soft", css=css) as demo:
             assign_btn = gr.Button("Assign Units")
             assignment_status = gr.Textbox(label="Assignment Status", interactive=False)
 
-    emergency_table.select(get_emergency_details, outputs=[
+    table_page = gr.State(None)
+    filters = [status_filter, priority_filter, type_filter, search_box]
+    dashboard_outputs = [
+        unassigned, assigned,
+        emergency_table, map_component,
+        police_units, ambulances, fire_trucks,
+        page_info, table_page
+    ]
+
+    emergency_table.select(get_emergency_details, inputs=[table_page], outputs=[
         selected_id, selected_priority, selected_caller,
         selected_emergency, selected_time, selected_location, selected_status,
         transcript, ai_recommendation,
         unit_types_dropdown, assignment_status
     ])
 
-    demo.load(update_dashboard, outputs=[
-        unassigned, assigned,
-        emergency_table, map_component,
-        police_units, ambulances, fire_trucks
-    ], every=5)
+    rendered_version = gr.State(-1)
+    demo.load(refresh_dashboard, inputs=[rendered_version, table_page] + filters,
+              outputs=dashboard_outputs + [rendered_version], every=1)
+    for dropdown in (status_filter, priority_filter):
+        dropdown.change(filter_dashboard, inputs=filters, outputs=dashboard_outputs)
+    for textbox in (type_filter, search_box):
+        textbox.submit(filter_dashboard, inputs=filters, outputs=dashboard_outputs)
+    prev_page_btn.click(lambda page, *f: turn_page(page, -1, *f), inputs=[table_page] + filters, outputs=dashboard_outputs)
+    next_page_btn.click(lambda page, *f: turn_page(page, 1, *f), inputs=[table_page] + filters, outputs=dashboard_outputs)
     demo.load(load_initial_details, outputs=[
         selected_id, selected_priority, selected_caller,
         selected_emergency, selected_time, selected_location, selected_status,
@@ -339,9 +398,9 @@ with gr.Blocks(theme="soft", css=css) as demo:
         unit_types_dropdown, assignment_status
     ])
 
-    def assign_and_refresh(unit_types, call_id):
+    def assign_and_refresh(unit_types, call_id, page, *filter_values):
         msg, assigned_units = assign_units(call_id, unit_types)
-        dashboard_values = update_dashboard()
+        dashboard_values = update_dashboard(page.offset if page is not None else 0, *filter_values)
         assigned_unit_display_str = ""
         if call_id in assigned_unit_map:
             assigned_unit_display_str = assigned_unit_display(assigned_unit_map[call_id])
@@ -350,12 +409,8 @@ with gr.Blocks(theme="soft", css=css) as demo:
 
     assign_btn.click(
         fn=assign_and_refresh,
-        inputs=[unit_types_dropdown, selected_id],
-        outputs=[
-            assignment_status,
-            unassigned, assigned, emergency_table, map_component,
-            police_units, ambulances, fire_trucks
-        ]
+        inputs=[unit_types_dropdown, selected_id, table_page] + filters,
+        outputs=[assignment_status] + dashboard_outputs
     )
 
 demo.launch()
@@ -0,0 +1,42 @@
+import json
+import logging
+import random
+import threading
+import time
+
+from websockets.sync.client import connect
+
+
+class LiveFeed(threading.Thread):
+    """Background consumer of the backend's /ws/dashboard push channel.
+
+    ``on_event(event)`` is called for every emergency/unit event and
+    ``on_resync()`` whenever the local view may have missed events: on every
+    (re)connect and when the server reports this client fell behind.
+    Reconnects with jittered backoff for as long as the process runs.
+    """
+
+    def __init__(self, url, on_event, on_resync, max_backoff=30.0):
+        super().__init__(daemon=True)
+        self.url = url
+        self.on_event = on_event
+        self.on_resync = on_resync
+        self.max_backoff = max_backoff
+
+    def run(self):
+        backoff = 1.0
+        while True:
+            try:
+                with connect(self.url, open_timeout=10) as ws:
+                    backoff = 1.0
+                    self.on_resync()
+                    for message in ws:
+                        event = json.loads(message)
+                        if event.get("type") == "resync":
+                            self.on_resync()
+                        elif event.get("type") not in ("hello", "ping"):
+                            self.on_event(event)
+            except Exception as e:
+                logging.warning(f"Live feed disconnected: {str(e)}")
+            time.sleep(random.uniform(0, backoff))
+            backoff = min(self.max_backoff, backoff * 2)
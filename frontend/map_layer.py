@@ -0,0 +1,110 @@
+import html
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import folium
+from folium.plugins import FastMarkerCluster
+
+MAP_CENTER = [39.8283, -98.5795]  # Center USA
+MAP_ZOOM = 4
+
+PRIORITY_COLORS = {"HIGH": "red", "MEDIUM": "orange", "LOW": "green"}
+
+# The map shows current work, not the whole history: every unassigned
+# incident, assigned ones from the last few hours, and never more than
+# MAX_MARKERS points in total
+ASSIGNED_WINDOW = timedelta(hours=6)
+MAX_MARKERS = 500
+
+# Runs in the browser for each point; one JS array instead of a folium.Marker per incident
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: 7, color: row[2], fillColor: row[2], fillOpacity: 0.8, weight: 1});
+    marker.bindPopup(row[3]);
+    return marker;
+}
+"""
+
+
+def is_active(row, since):
+    """Unassigned, or assigned but reported after ``since``."""
+    if row['STATUS'] == 'UNASSIGNED':
+        return True
+    try:
+        return datetime.fromisoformat(str(row['TIME'])) >= since
+    except (TypeError, ValueError):
+        return False
+
+
+def marker_points(rows, limit=MAX_MARKERS):
+    """[lat, lon, color, popup] for active rows with usable coordinates.
+
+    Rows come in dashboard order (unassigned first, then by priority), so
+    when the cap is hit it is the least pressing incidents that are left off.
+    """
+    since = datetime.utcnow() - ASSIGNED_WINDOW
+    points = []
+    for row in rows:
+        if len(points) >= limit:
+            break
+        if not is_active(row, since):
+            continue
+        try:
+            lat = float(row['LAT'])
+            lon = float(row['LON'])
+        except (TypeError, ValueError):
+            continue
+        priority = str(row['PRIORITY'])
+        color = next((c for p, c in PRIORITY_COLORS.items() if p in priority), 'green')
+        popup = html.escape(f"ID: {row['ID']}, {row['EMERGENCY']}, Priority: {priority}")
+        points.append([lat, lon, color, popup])
+    return points
+
+
+class MapLayer:
+    """Emergency map HTML, rendered once per snapshot version.
+
+    Every browser session asks for the same few maps, so the rendered HTML
+    is kept in a small LRU and shared. Renders are serialized: when several
+    sessions notice a new version at once, one renders and the rest wait
+    and then read the cache. Snapshots are immutable, so no data lock is
+    held while folium works.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # version -> html
+        self._cache_lock = threading.Lock()
+        self._render_lock = threading.Lock()
+
+    def _cached(self, key):
+        with self._cache_lock:
+            html_ = self._cache.get(key)
+            if html_ is not None:
+                self._cache.move_to_end(key)
+            return html_
+
+    def html(self, snapshot):
+        key = snapshot.version
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        with self._render_lock:
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            rendered = self._render(snapshot)
+        with self._cache_lock:
+            self._cache[key] = rendered
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return rendered
+
+    def _render(self, snapshot):
+        points = marker_points(snapshot.rows)
+        m = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+        if points:
+            FastMarkerCluster(points, callback=MARKER_CALLBACK).add_to(m)
+        return m._repr_html_()